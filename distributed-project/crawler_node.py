@@ -1,16 +1,26 @@
 import requests
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 import time
 import logging
 import boto3
-import hashlib
-import json
+import xxhash
+import gzip
+import io
+import orjson
 import socket
-from botocore.exceptions import ClientError
+import functools
+import sys
+import threading
+import queue
+from collections import OrderedDict
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
-from urllib.parse import urlparse
-from urllib.robotparser import RobotFileParser
+from urllib.parse import urljoin, urlsplit
+from protego import Protego
+from diskcache import Cache
 
 # Setup logging
 logging.basicConfig(
@@ -18,10 +28,16 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-# AWS Clients with retry configuration
+# AWS Clients with retry configuration; the pool is sized for CRAWL_WORKERS threads
+# plus the background receiver so concurrent calls reuse kept-alive connections
+aws_config = Config(
+    max_pool_connections=64,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    tcp_keepalive=True
+)
 session = boto3.Session(region_name='eu-north-1')
-sqs = session.client('sqs')
-s3 = session.client('s3')
+sqs = session.client('sqs', config=aws_config)
+s3 = session.client('s3', config=aws_config)
 
 # Constants
 CRAWLER_ID = socket.gethostname()
@@ -31,6 +47,122 @@ BUCKET_NAME = 'distributed-crawler-data'
 CRAWL_DELAY = 1
 MAX_RETRIES = 3
 HEARTBEAT_INTERVAL = 60  # seconds
+ROBOTS_CACHE_SIZE = 1024  # hosts whose parsed robots.txt is kept
+ROBOTS_CACHE_TTL = 3600  # seconds before robots.txt is fetched again
+ROBOTS_CACHE_DIR = 'robots_cache'  # on-disk copy of robots.txt bodies, survives restarts
+ROBOTS_DISK_LIMIT = 64 * 1024 * 1024  # bytes the on-disk robots cache may grow to
+GZIP_LEVEL = 6  # near level-9 ratio on HTML at a fraction of the CPU
+MAX_PAGE_BYTES = 5 * 1024 * 1024  # bodies larger than this are abandoned mid-download
+USER_AGENT = 'DistributedCrawler/1.0'
+# URLs whose path ends in one of these are never HTML, so they are not fetched or queued
+SKIP_EXTENSIONS = frozenset({
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico',
+    '.zip', '.gz', '.tar', '.mp4', '.mp3', '.avi',
+    '.css', '.js', '.woff', '.woff2'
+})
+DNS_CACHE_TTL = 300  # seconds a resolved host address is reused
+DNS_CACHE_SIZE = 4096  # entries kept before the cache is reset
+HTTP_POOL_SIZE = 64  # keep-alive connections kept per host pool
+UPLOAD_WORKERS = 4  # background threads draining the S3 upload queue
+UPLOAD_QUEUE_SIZE = 256  # pages buffered before fetch workers block (backpressure)
+CRAWL_WORKERS = 10  # pages fetched concurrently (SQS returns at most 10 per receive)
+MULTIPART_THRESHOLD = 5 * 1024 * 1024  # compressed bodies at or above this are sent in parallel parts
+MAX_RECEIVE_COUNT = 5  # deliveries after which a message is dropped instead of crawled
+SEEN_URLS_SIZE = 1_000_000  # URL digests remembered for dedup before the map is reset
+
+# Only used for outsized pages; smaller bodies go out as a single put_object
+transfer_config = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=4,
+    use_threads=True
+)
+
+AWS_HOST_SUFFIX = '.amazonaws.com'  # endpoint hosts resolved uncached, honouring their own TTLs
+
+# Python does not cache DNS lookups, so every new connection to a crawled host pays a
+# getaddrinfo round-trip; poll_and_crawl installs this TTL cache in front of it for the
+# length of the crawl. The patch is process-wide, so S3/SQS endpoint lookups are passed
+# straight through: their records rotate and must not be pinned for DNS_CACHE_TTL
+_original_getaddrinfo = socket.getaddrinfo
+_dns_cache = {}
+
+def _cached_getaddrinfo(*args, **kwargs):
+    host = args[0] if args else kwargs.get('host')
+    if isinstance(host, bytes):
+        host = host.decode('ascii', 'replace')
+    if not isinstance(host, str) or host.lower().rstrip('.').endswith(AWS_HOST_SUFFIX):
+        return _original_getaddrinfo(*args, **kwargs)
+    key = (args, tuple(sorted(kwargs.items())))
+    now = time.monotonic()
+    cached = _dns_cache.get(key)
+    if cached and cached[1] > now:
+        return cached[0]
+    result = _original_getaddrinfo(*args, **kwargs)
+    if len(_dns_cache) >= DNS_CACHE_SIZE:
+        _dns_cache.clear()
+    _dns_cache[key] = (result, now + DNS_CACHE_TTL)
+    return result
+
+@functools.lru_cache(maxsize=4096)
+def split_url(url):
+    """Return (scheme, netloc, origin) for a URL; memoized since hosts repeat constantly"""
+    parsed = urlsplit(url)
+    return parsed.scheme, parsed.netloc, sys.intern(f"{parsed.scheme}://{parsed.netloc}")
+
+def base_directory(url):
+    """The URL of the directory a page lives in; relative links resolve the same against it"""
+    scheme, netloc, path = urlsplit(url)[:3]
+    return f"{scheme}://{netloc}{path[:path.rfind('/') + 1] or '/'}"
+
+@functools.lru_cache(maxsize=8192)
+def join_relative(base_dir, href):
+    """urljoin memoized per directory, since sibling pages share most relative links"""
+    return urljoin(base_dir, href)
+
+def is_skipped_path(path):
+    """True if a URL path ends in an extension that is never worth crawling"""
+    dot = path.rfind('.')
+    return dot > path.rfind('/') and path[dot:].lower() in SKIP_EXTENSIONS
+
+def url_digest(url):
+    """128-bit xxh3 hex digest of a URL, used as its S3 object name"""
+    return xxhash.xxh3_128_hexdigest(url.encode())
+
+# Shared rule sets for hosts without a usable robots.txt
+ALLOW_ALL = Protego.parse("")
+ALLOW_NONE = Protego.parse("User-agent: *\nDisallow: /")
+
+# Compiled once at import instead of per page; plain strings avoid lxml's smart-string wrappers
+_DROP_TAGS = ('script', 'style')
+_TEXT_XPATH = etree.XPath('//text()', smart_strings=False)
+_LINK_XPATH = etree.XPath('//a/@href', smart_strings=False)
+
+# One lxml parser per worker thread: a shared parser instance serializes parses,
+# and dropping comments/processing instructions keeps the tree lean
+_parser_local = threading.local()
+
+def _html_parser(encoding=None):
+    parsers = getattr(_parser_local, 'parsers', None)
+    if parsers is None:
+        parsers = _parser_local.parsers = {}
+    parser = parsers.get(encoding)
+    if parser is None:
+        try:
+            parser = lxml.html.HTMLParser(encoding=encoding, remove_comments=True, remove_pis=True)
+        except LookupError:
+            # Unknown charset name from a header: let libxml2 sniff <meta charset> instead
+            return _html_parser()
+        parsers[encoding] = parser
+    return parser
+
+def charset_from_content_type(content_type):
+    """Return the charset parameter of a Content-Type header, or None"""
+    for param in (content_type or '').split(';')[1:]:
+        key, _, value = param.partition('=')
+        if key.strip().lower() == 'charset':
+            return value.strip().strip('"\'') or None
+    return None
 
 class Crawler:
     def __init__(self, delay=1, max_retries=MAX_RETRIES):
@@ -42,10 +174,26 @@ class Crawler:
         self.uploaded_count = 0
         self.max_retries = max_retries
         self.session = self._create_session()
-        self.robots_cache = {}  # Cache for robots.txt parsers
+        self.robots_cache = OrderedDict()  # base_url -> (parser, fetched_at), LRU order
+        self._robots_lock = threading.Lock()
+        # Raw robots.txt text keyed by origin; Cache is thread- and process-safe
+        self.robots_disk = Cache(ROBOTS_CACHE_DIR, size_limit=ROBOTS_DISK_LIMIT)
+        self._next_allowed = {}  # netloc -> monotonic time of next allowed request
+        self._host_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self._seen = {}  # digest of each URL this node has crawled -> link depth it had left
+        self._seen_lock = threading.Lock()
+        # S3 uploads run in the background so fetch workers never wait on a PUT
+        self._upload_q = queue.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+        self._upload_threads = [
+            threading.Thread(target=self._upload_worker, daemon=True)
+            for _ in range(UPLOAD_WORKERS)
+        ]
+        for thread in self._upload_threads:
+            thread.start()
         
     def _create_session(self):
-        """Create a requests session with retry logic"""
+        """Create a requests session with retry logic and a sized keep-alive pool"""
         session = requests.Session()
         retry_strategy = Retry(
             total=self.max_retries,
@@ -53,263 +201,543 @@ class Crawler:
             allowed_methods=["GET"],
             backoff_factor=1
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=retry_strategy
+        )
         session.mount("https://", adapter)
         session.mount("http://", adapter)
+        # urllib3 decodes br transparently once the brotli package is installed
+        session.headers.update({
+            'Accept-Encoding': 'gzip, deflate, br',
+            'User-Agent': USER_AGENT
+        })
         return session
 
     def get_robots_parser(self, url):
         """Get or create a robots.txt parser for the domain"""
-        parsed_url = urlparse(url)
-        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+        base_url = split_url(url)[2]
         
-        # Return cached parser if available and not expired (1 hour cache)
-        if base_url in self.robots_cache:
-            parser, timestamp = self.robots_cache[base_url]
-            if time.time() - timestamp < 3600:  # 1 hour cache
-                return parser
+        # Return cached parser if available and not expired
+        with self._robots_lock:
+            cached = self.robots_cache.get(base_url)
+            if cached and time.time() - cached[1] < ROBOTS_CACHE_TTL:
+                self.robots_cache.move_to_end(base_url)
+                return cached[0]
+
+        # A previous run (or another crawler process on this host) may have fetched it already
+        stored = self.robots_disk.get(base_url)
+        if stored is not None:
+            text, fetched_at = stored
+            parser = Protego.parse(text) if text else ALLOW_ALL
+            self._cache_robots(base_url, parser, fetched_at)
+            return parser
                 
         # Create new parser
+        robots_url = f"{base_url}/robots.txt"
         try:
-            robots_url = f"{base_url}/robots.txt"
             logging.info(f"📋 Fetching robots.txt: {robots_url}")
-            
-            parser = RobotFileParser()
-            parser.set_url(robots_url)
-            
-            # Try to fetch and parse the robots.txt
             response = self.session.get(robots_url, timeout=5)
             if response.status_code == 200:
-                parser.parse(response.text.splitlines())
+                parser = Protego.parse(response.text)
+                self._store_robots(base_url, response.text)
                 logging.info(f"✅ Parsed robots.txt for {base_url}")
+            elif response.status_code >= 500:
+                # RFC 9309: an unreachable robots.txt means assume complete disallow
+                logging.warning(f"⚠️ robots.txt at {robots_url} returned {response.status_code}, disallowing host")
+                parser = ALLOW_NONE
             else:
                 logging.warning(f"⚠️ No robots.txt available at {robots_url}")
                 # If no robots.txt, assume everything is allowed
-                parser = RobotFileParser()
-                parser.allow_all = True
-                
-            # Cache the parser
-            self.robots_cache[base_url] = (parser, time.time())
-            return parser
-            
+                parser = ALLOW_ALL
+                self._store_robots(base_url, "")
+        except requests.exceptions.RetryError as e:
+            # Retries exhausted on 5xx responses: same server-error rule as above
+            logging.warning(f"⚠️ robots.txt at {robots_url} kept failing ({e}), disallowing host")
+            parser = ALLOW_NONE
         except Exception as e:
             logging.error(f"❌ Error fetching robots.txt for {base_url}: {e}")
-            # On error, be permissive (allow all)
-            parser = RobotFileParser()
-            parser.allow_all = True
-            self.robots_cache[base_url] = (parser, time.time())
-            return parser
+            # On network error, be permissive (allow all)
+            parser = ALLOW_ALL
+
+        # Cache the parser
+        self._cache_robots(base_url, parser)
+        return parser
+
+    def _store_robots(self, base_url, text):
+        """Persist a definitive robots.txt answer; server and network errors are not kept"""
+        self.robots_disk.set(base_url, (text, time.time()), expire=ROBOTS_CACHE_TTL)
+
+    def _cache_robots(self, base_url, parser, fetched_at=None):
+        """Store a parser, evicting the least recently used host past ROBOTS_CACHE_SIZE"""
+        with self._robots_lock:
+            self.robots_cache[base_url] = (parser, fetched_at or time.time())
+            self.robots_cache.move_to_end(base_url)
+            while len(self.robots_cache) > ROBOTS_CACHE_SIZE:
+                self.robots_cache.popitem(last=False)
 
     def can_fetch(self, url):
         """Check if a URL is allowed by robots.txt"""
         parser = self.get_robots_parser(url)
-        can_fetch = parser.can_fetch("*", url)
+        can_fetch = parser.can_fetch(url, "*")
         
         if not can_fetch:
             logging.warning(f"🚫 URL disallowed by robots.txt: {url}")
-            self.failed_count += 1
+            self.increment('failed_count')
             return False
-        
-        # Check for and respect crawl delay
-        crawl_delay = parser.crawl_delay("*")
-        if crawl_delay and crawl_delay > self.delay:
-            logging.info(f"⏱️ Respecting robots.txt crawl delay of {crawl_delay}s for {urlparse(url).netloc}")
-            self.delay = crawl_delay
             
         return True
 
+    def host_delay(self, url):
+        """Seconds between requests to this URL's host: robots.txt crawl delay or our default"""
+        crawl_delay = self.get_robots_parser(url).crawl_delay("*")
+        if crawl_delay and crawl_delay > self.delay:
+            return crawl_delay
+        return self.delay
+
+    def mark_seen(self, digest, remaining):
+        """Claim a URL digest for crawling with `remaining` levels of links left to follow
+
+        Returns False if this node has already crawled (or is crawling) the URL with at
+        least that much depth left, so a deeper re-submission still gets expanded.
+        """
+        with self._seen_lock:
+            previous = self._seen.get(digest)
+            if previous is not None and previous >= remaining:
+                return False
+            if len(self._seen) >= SEEN_URLS_SIZE:
+                self._seen.clear()
+            self._seen[digest] = remaining
+            return True
+
+    def forget_seen(self, digest, remaining):
+        """Release a claim whose fetch failed, so redeliveries and requeues are crawled again"""
+        with self._seen_lock:
+            if self._seen.get(digest) == remaining:
+                del self._seen[digest]
+
+    def increment(self, counter):
+        """Thread-safe increment of one of the heartbeat counters"""
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _wait_for_host(self, host, delay):
+        """Reserve the next request slot for this host and sleep until it opens"""
+        with self._host_lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed.get(host, 0))
+            self._next_allowed[host] = start + delay
+        if start > now:
+            time.sleep(start - now)
+
     def fetch_page(self, url):
-        """Fetch a web page with error handling"""
-        # First check robots.txt
+        """Fetch a web page with error handling, returning (raw bytes, Content-Type)"""
+        # Images, archives and the like would only be discarded after the GET
+        if is_skipped_path(urlsplit(url).path):
+            logging.info(f"⏭️ Skipping non-HTML URL: {url}")
+            return None
+
+        # Then check robots.txt
         if not self.can_fetch(url):
             return None
 
+        # Each host is paced on its own, so a slow robots.txt delay never holds up other hosts
+        self._wait_for_host(split_url(url)[1], self.host_delay(url))
         try:
             logging.info(f"🌐 Fetching: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            time.sleep(self.delay)  # Simple delay between requests
-            return response.text
+            # Stream so headers can be checked before any of the body is downloaded
+            with self.session.get(url, timeout=10, stream=True) as response:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type', 'text/html')
+                lowered = content_type.lower()
+                if 'text/html' not in lowered and 'xhtml' not in lowered:
+                    logging.info(f"⏭️ Skipping non-HTML response ({content_type}): {url}")
+                    return None
+                # A declared (possibly compressed) length over the cap can only decode larger
+                declared = response.headers.get('Content-Length')
+                if declared and declared.isdigit() and int(declared) > MAX_PAGE_BYTES:
+                    logging.warning(f"⚠️ Skipping page larger than {MAX_PAGE_BYTES} bytes: {url}")
+                    return None
+                content = self._read_limited(response)
+                if content is None:
+                    logging.warning(f"⚠️ Skipping page larger than {MAX_PAGE_BYTES} bytes: {url}")
+                    return None
+                # Raw bytes: lxml decodes them itself, so requests never has to guess an encoding
+                return content, content_type
         except requests.exceptions.RequestException as e:
-            self.failed_count += 1
+            self.increment('failed_count')
             logging.error(f"❌ Failed to fetch {url}: {e}")
             return None
 
-    def extract_text(self, html):
-        """Extract text from HTML"""
+    def _read_limited(self, response):
+        """Read a streamed body, giving up (None) once it exceeds MAX_PAGE_BYTES"""
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            size += len(chunk)
+            if size > MAX_PAGE_BYTES:
+                return None
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    def parse_html(self, html, encoding=None):
+        """Parse HTML once so text and links can share the same tree
+
+        Accepts raw bytes (encoding from the HTTP header, else lxml reads <meta charset>)
+        or already decoded text.
+        """
+        if isinstance(html, str):
+            # Encode first: lxml rejects str input that carries an XML encoding declaration
+            html, encoding = html.encode('utf-8'), 'utf-8'
+        return lxml.html.fromstring(html, parser=_html_parser(encoding))
+
+    def _extract_text_from_tree(self, tree):
+        """Extract text from an already parsed page (drops script/style in place)"""
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            for tag in soup(['script', 'style']):
-                tag.decompose()
-            return soup.get_text(separator=' ', strip=True)
+            etree.strip_elements(tree, *_DROP_TAGS, with_tail=False)
+            return ' '.join(text.strip() for text in _TEXT_XPATH(tree) if text.strip())
         except Exception as e:
             logging.error(f"❌ Text extraction error: {e}")
             return ""
 
-    def extract_links(self, html, base_url):
-        """Extract links from HTML"""
+    def _extract_links_from_tree(self, tree, base_url):
+        """Extract links from an already parsed page"""
         try:
-            soup = BeautifulSoup(html, 'html.parser')
             links = set()
-            for tag in soup.find_all('a', href=True):
-                href = tag['href']
-                if href.startswith('http'):
+            tails = set()  # root-relative paths; deduplicated before the origin is prepended
+            scheme, _, origin = split_url(base_url)
+            base_dir = None
+            for href in _LINK_XPATH(tree):
+                # Absolute and root-relative links (the vast majority) skip urljoin
+                if href.startswith(('http://', 'https://')):
                     links.add(href)
+                elif href.startswith('//'):
+                    links.add(scheme + ':' + href)
                 elif href.startswith('/'):
-                    links.add(base_url.rstrip('/') + href)
+                    tails.add(href)
+                elif href.startswith('?'):
+                    # Query-only links depend on the full page path, not just its directory
+                    full = urljoin(base_url, href)
+                    if full.startswith(('http://', 'https://')):
+                        links.add(full)
+                elif href and not href.startswith('#'):
+                    if base_dir is None:
+                        base_dir = base_directory(base_url)
+                    full = join_relative(base_dir, href)
+                    # Drops mailto:, javascript: and other non-web schemes
+                    if full.startswith(('http://', 'https://')):
+                        links.add(full)
+            links.update(origin + tail for tail in tails)
             return list(links)
         except Exception as e:
             logging.error(f"❌ Link extraction error: {e}")
             return []
 
-    def upload_to_s3(self, html, url):
-        """Upload HTML content to S3 with retry logic"""
+    def extract(self, html, base_url, encoding=None):
+        """Extract (text, links) from HTML with a single parse"""
         try:
-            filename = hashlib.md5(url.encode()).hexdigest() + '.html'
-            
-            # Upload to S3 with retry
-            for attempt in range(self.max_retries):
-                try:
-                    self.s3.put_object(
-                        Bucket=BUCKET_NAME,
-                        Key=filename,
-                        Body=html,
-                        ContentType='text/html',
-                        Metadata={'original-url': url}
-                    )
+            tree = self.parse_html(html, encoding)
+        except Exception as e:
+            logging.error(f"❌ HTML parse error: {e}")
+            return "", []
+        # Links first: text extraction strips script/style from the tree in place
+        links = self._extract_links_from_tree(tree, base_url)
+        return self._extract_text_from_tree(tree), links
+
+    def extract_text(self, html, encoding=None):
+        """Extract text from HTML"""
+        try:
+            return self._extract_text_from_tree(self.parse_html(html, encoding))
+        except Exception as e:
+            logging.error(f"❌ Text extraction error: {e}")
+            return ""
+
+    def extract_links(self, html, base_url, encoding=None):
+        """Extract links from HTML; the crawl loop needs only these, so it skips text extraction"""
+        try:
+            return self._extract_links_from_tree(self.parse_html(html, encoding), base_url)
+        except Exception as e:
+            logging.error(f"❌ Link extraction error: {e}")
+            return []
+
+    def upload_to_s3(self, html, url, content_type='text/html', digest=None):
+        """Queue a page for background upload; blocks only when the queue is full"""
+        self._upload_q.put((html, url, content_type, digest))
+
+    def _upload_worker(self):
+        """Drain the upload queue until a None sentinel arrives"""
+        while True:
+            item = self._upload_q.get()
+            try:
+                if item is None:
                     break
-                except ClientError as e:
-                    if attempt < self.max_retries - 1:
-                        logging.warning(f"⚠️ S3 upload attempt {attempt+1} failed, retrying: {e}")
-                        time.sleep(2 ** attempt)  # Exponential backoff
-                    else:
-                        raise
+                self._put_to_s3(*item)
+            finally:
+                self._upload_q.task_done()
+
+    def close(self):
+        """Flush queued uploads, stop the upload threads and close the robots cache"""
+        for _ in self._upload_threads:
+            self._upload_q.put(None)
+        for thread in self._upload_threads:
+            thread.join()
+        self.robots_disk.close()
+
+    def _put_to_s3(self, html, url, content_type='text/html', digest=None):
+        """Upload gzip-compressed HTML content to S3
+
+        Raw bytes are stored as fetched; content_type keeps the page's charset for the indexer.
+        """
+        try:
+            filename = (digest or url_digest(url)) + '.html.gz'
+            # HTML compresses several-fold, so this cuts PUT bytes and storage
+            if isinstance(html, str):
+                html, content_type = html.encode('utf-8'), 'text/html; charset=utf-8'
+            body = gzip.compress(html, compresslevel=GZIP_LEVEL)
             
-            self.uploaded_count += 1
+            # Transient errors are retried by the client's adaptive retry config
+            extra_args = {
+                'ContentType': content_type,
+                'ContentEncoding': 'gzip',
+                'Metadata': {'original-url': url}
+            }
+            if len(body) < MULTIPART_THRESHOLD:
+                # Nearly every page: one PUT, no multipart initiate/complete round-trips
+                self.s3.put_object(Bucket=BUCKET_NAME, Key=filename, Body=body, **extra_args)
+            else:
+                self.s3.upload_fileobj(
+                    io.BytesIO(body), BUCKET_NAME, filename,
+                    Config=transfer_config, ExtraArgs=extra_args
+                )
+            
+            self.increment('uploaded_count')
             logging.info(f"✅ Uploaded to S3: {filename}")
             return filename
         except Exception as e:
-            self.failed_count += 1
+            self.increment('failed_count')
             logging.error(f"❌ S3 upload failed: {e}")
             return None
 
     def send_heartbeat(self):
-        """Send heartbeat with basic retry"""
+        """Send heartbeat with current counters"""
         try:
-            heartbeat = {
-                "crawler_id": CRAWLER_ID,
-                "status": "alive",
-                "timestamp": time.time(),
-                "crawled": self.crawled_count,
-                "uploaded": self.uploaded_count,
-                "failed": self.failed_count
-            }
+            # Snapshot all counters together so the heartbeat is internally consistent
+            with self._counter_lock:
+                heartbeat = {
+                    "crawler_id": CRAWLER_ID,
+                    "status": "alive",
+                    "timestamp": time.time(),
+                    "crawled": self.crawled_count,
+                    "uploaded": self.uploaded_count,
+                    "failed": self.failed_count
+                }
             
-            # Try to send with simple retry
-            for attempt in range(self.max_retries):
-                try:
-                    self.sqs.send_message(
-                        QueueUrl=HEARTBEAT_QUEUE_URL,
-                        MessageBody=json.dumps(heartbeat)
-                    )
-                    break
-                except ClientError:
-                    if attempt < self.max_retries - 1:
-                        time.sleep(1)  # Simple delay between retries
+            self.sqs.send_message(
+                QueueUrl=HEARTBEAT_QUEUE_URL,
+                MessageBody=orjson.dumps(heartbeat).decode()
+            )
             
             logging.info("💓 Heartbeat sent")
         except Exception as e:
             logging.error(f"❌ Failed to send heartbeat: {e}")
 
+def process_message(crawler, message):
+    """Crawl the URL carried by one SQS message and queue its discovered links"""
+    try:
+        # A message that keeps coming back has taken a crawler down with it before
+        receive_count = int(message.get('Attributes', {}).get('ApproximateReceiveCount', 1))
+        if receive_count > MAX_RECEIVE_COUNT:
+            logging.warning(f"⚠️ Dropping message received {receive_count} times: {message['Body'][:200]}")
+            crawler.increment('failed_count')
+            return
+
+        raw_body = message['Body']
+        try:
+            body = orjson.loads(raw_body)
+            url = body.get('url')
+            depth = body.get('depth', 0)
+            depth_limit = body.get('depth_limit', 0)
+            restrict_domain = body.get('restrict_domain', True)
+        except orjson.JSONDecodeError:
+            url = raw_body.strip()
+            logging.info(f"Processing plain URL: {url}")
+            depth = 0
+            depth_limit = 0
+            restrict_domain = True
+
+        if not url:
+            logging.warning("⚠️ No URL in message")
+            return
+
+        # Hashed once per URL and reused wherever the URL needs a compact key
+        digest = url_digest(url)
+        # Links are re-discovered constantly; skip the fetch, parse and PUT for repeats
+        # unless this message may follow links deeper than the earlier crawl did
+        remaining = max(depth_limit - depth, 0)
+        if not crawler.mark_seen(digest, remaining):
+            logging.debug(f"🔁 Already crawled with this depth left, skipping: {url}")
+            return
+
+        # Fetch and process page; a failed fetch gives the claim back
+        page = None
+        try:
+            page = crawler.fetch_page(url)
+        finally:
+            if not page:
+                crawler.forget_seen(digest, remaining)
+        if page:
+            html, content_type = page
+            crawler.increment('crawled_count')
+            crawler.upload_to_s3(html, url, content_type, digest)
+            links = crawler.extract_links(html, url, charset_from_content_type(content_type))
+            logging.info(f"🔍 Crawled {url}, found {len(links)} links")
+
+            # Re-queue discovered links if under depth limit
+            if depth < depth_limit:
+                netloc = split_url(url)[1] if restrict_domain else None
+                kept = []
+                for link in links:
+                    parts = urlsplit(link)
+                    if netloc is not None and parts.netloc != netloc:
+                        continue
+                    if is_skipped_path(parts.path):
+                        continue
+                    kept.append(link)
+                links = kept
+                queue_links(links, depth + 1, depth_limit, restrict_domain)
+    except Exception as e:
+        logging.error(f"❌ Error processing message: {e}")
+        crawler.increment('failed_count')
+
+def queue_links(links, depth, depth_limit, restrict_domain):
+    """Send discovered links to the crawl queue, 10 per SendMessageBatch call"""
+    for start in range(0, len(links), 10):
+        chunk = links[start:start + 10]
+        entries = [
+            {
+                'Id': str(i),
+                'MessageBody': orjson.dumps({
+                    "url": link,
+                    "depth": depth,
+                    "depth_limit": depth_limit,
+                    "restrict_domain": restrict_domain
+                }).decode()
+            }
+            for i, link in enumerate(chunk)
+        ]
+        try:
+            response = sqs.send_message_batch(QueueUrl=QUEUE_URL, Entries=entries)
+            for failure in response.get('Failed', []):
+                link = chunk[int(failure['Id'])]
+                logging.error(f"❌ Failed to queue discovered link {link}: {failure.get('Message')}")
+            logging.info(f"🔗 Queued {len(response.get('Successful', []))} discovered links")
+        except Exception as e:
+            logging.error(f"❌ Failed to queue discovered links: {e}")
+
+def delete_messages(messages):
+    """Delete a received batch (max 10) from the crawl queue in one API call"""
+    entries = [
+        {'Id': str(i), 'ReceiptHandle': message['ReceiptHandle']}
+        for i, message in enumerate(messages)
+    ]
+    try:
+        response = sqs.delete_message_batch(QueueUrl=QUEUE_URL, Entries=entries)
+        for failure in response.get('Failed', []):
+            logging.error(f"❌ Failed to delete message {failure['Id']}: {failure.get('Message')}")
+    except Exception as e:
+        logging.error(f"❌ Failed to delete message batch: {e}")
+
+def receive_messages():
+    """Long-poll the crawl queue for up to 10 messages"""
+    response = sqs.receive_message(
+        QueueUrl=QUEUE_URL, 
+        MaxNumberOfMessages=10, 
+        WaitTimeSeconds=20,
+        AttributeNames=['ApproximateReceiveCount']
+    )
+    return response.get('Messages', [])
+
+class MessageBatch:
+    """Tracks one received SQS batch so it is deleted in one call once fully crawled"""
+    def __init__(self, messages):
+        self.messages = messages
+        self._remaining = len(messages)
+        self._lock = threading.Lock()
+
+    def done(self):
+        with self._lock:
+            self._remaining -= 1
+            finished = self._remaining == 0
+        if finished:
+            delete_messages(self.messages)
+
+def crawl_worker(crawler, work_queue):
+    """Crawl messages from the work queue until a None sentinel arrives"""
+    while True:
+        item = work_queue.get()
+        if item is None:
+            break
+        message, batch = item
+        try:
+            process_message(crawler, message)
+        finally:
+            # Always delete the message when done (batched with its siblings)
+            batch.done()
+
+def heartbeat_loop(crawler, stop_event):
+    """Send heartbeats every HEARTBEAT_INTERVAL, independent of how long crawls take"""
+    while not stop_event.wait(HEARTBEAT_INTERVAL):
+        crawler.send_heartbeat()
+
 def poll_and_crawl():
-    """Main crawling function with error handling"""
+    """Main crawling function with error handling
+
+    The main thread long-polls SQS and feeds a bounded work queue; CRAWL_WORKERS
+    threads crawl messages as they arrive, so one slow page never holds up the rest.
+    """
     crawler = Crawler(delay=CRAWL_DELAY)
-    last_heartbeat_time = time.time()
+    # Bounded to one batch: the next receive waits until workers have room
+    work_queue = queue.Queue(maxsize=CRAWL_WORKERS)
+    workers = [
+        threading.Thread(target=crawl_worker, args=(crawler, work_queue), daemon=True)
+        for _ in range(CRAWL_WORKERS)
+    ]
+    for worker in workers:
+        worker.start()
+    socket.getaddrinfo = _cached_getaddrinfo
     
-    logging.info(f"🚀 Crawler node {CRAWLER_ID} starting")
+    logging.info(f"🚀 Crawler node {CRAWLER_ID} starting with {CRAWL_WORKERS} workers")
     
-    # Send initial heartbeat
+    # Send initial heartbeat, then keep them coming from a background thread so a
+    # long receive or a stalled fetch never makes the dashboard think we are dead
     crawler.send_heartbeat()
+    stop_heartbeat = threading.Event()
+    threading.Thread(target=heartbeat_loop, args=(crawler, stop_heartbeat), daemon=True).start()
 
     while True:
         try:
-            # Send heartbeat at regular intervals
-            now = time.time()
-            if now - last_heartbeat_time >= HEARTBEAT_INTERVAL:
-                crawler.send_heartbeat()
-                last_heartbeat_time = now
-
-            # Get message from queue
-            messages = sqs.receive_message(
-                QueueUrl=QUEUE_URL, 
-                MaxNumberOfMessages=1, 
-                WaitTimeSeconds=10
-            )
+            # Get a batch of messages from the queue
+            messages = receive_messages()
             
-            if 'Messages' not in messages:
-                logging.info("📭 No messages in queue, waiting...")
+            if not messages:
+                logging.debug("📭 No messages in queue, waiting...")
                 continue
 
-            for message in messages['Messages']:
-                try:
-                    raw_body = message['Body']
-                    try:
-                        body = json.loads(raw_body)
-                        url = body.get('url')
-                        depth = body.get('depth', 0)
-                        depth_limit = body.get('depth_limit', 0)
-                        restrict_domain = body.get('restrict_domain', True)
-                    except json.JSONDecodeError:
-                        url = raw_body.strip()
-                        logging.info(f"Processing plain URL: {url}")
-                        depth = 0
-                        depth_limit = 0
-                        restrict_domain = True
-
-                    if not url:
-                        logging.warning("⚠️ No URL in message")
-                        sqs.delete_message(QueueUrl=QUEUE_URL, ReceiptHandle=message['ReceiptHandle'])
-                        continue
-
-                    # Fetch and process page
-                    html = crawler.fetch_page(url)
-                    if html:
-                        crawler.crawled_count += 1
-                        crawler.upload_to_s3(html, url)
-                        links = crawler.extract_links(html, url)
-                        logging.info(f"🔍 Crawled {url}, found {len(links)} links")
-
-                        # Re-queue discovered links if under depth limit
-                        depth = body.get("depth", 0)
-                        depth_limit = body.get("depth_limit", 0)
-                        restrict_domain = body.get("restrict_domain", False)
-
-                        if depth < depth_limit:
-                            for link in links:
-                                if restrict_domain:
-                                    if urlparse(link).netloc != urlparse(url).netloc:
-                                        continue
-                                message = json.dumps({
-                                    "url": link,
-                                    "depth": depth + 1,
-                                    "depth_limit": depth_limit,
-                                    "restrict_domain": restrict_domain
-                                })
-                                try:
-                                    sqs.send_message(QueueUrl=QUEUE_URL, MessageBody=message)
-                                    logging.info(f"🔗 Discovered link queued: {link}")
-                                except Exception as e:
-                                    logging.error(f"❌ Failed to queue discovered link: {e}")
-                except Exception as e:
-                    logging.error(f"❌ Error processing message: {e}")
-                    crawler.failed_count += 1
-                finally:
-                    # Always delete the message when done
-                    sqs.delete_message(QueueUrl=QUEUE_URL, ReceiptHandle=message['ReceiptHandle'])
+            batch = MessageBatch(messages)
+            for message in messages:
+                work_queue.put((message, batch))
 
         except KeyboardInterrupt:
             logging.info("👋 Crawler stopping")
+            stop_heartbeat.set()
+            for _ in workers:
+                work_queue.put(None)
+            for worker in workers:
+                worker.join()
+            crawler.close()  # Drain pending uploads so the final counts are accurate
             crawler.send_heartbeat()  # Final heartbeat
+            socket.getaddrinfo = _original_getaddrinfo
             break
             
         except Exception as e:
@@ -1,11 +1,13 @@
 import boto3
-import json
+from botocore.config import Config
+import orjson
 import time
+import io
 from datetime import datetime, timedelta
-import os
 import sys
 import argparse
 from collections import deque
+from operator import itemgetter
 import colorama
 from colorama import Fore, Back, Style
 import threading
@@ -16,7 +18,11 @@ colorama.init(autoreset=True)
 # AWS setup - use explicit credentials and region to ensure connectivity
 try:
     # Use standard boto3 credential resolution (environment vars, AWS config files, etc.)
-    sqs = boto3.client("sqs", region_name="eu-north-1")
+    # Adaptive retries back off under SQS throttling; keepalive reuses the monitor connections
+    sqs = boto3.client("sqs", region_name="eu-north-1", config=Config(
+        retries={"mode": "adaptive", "max_attempts": 3},
+        tcp_keepalive=True
+    ))
 except Exception as e:
     print(f"Failed to initialize AWS clients: {e}")
     sys.exit(1)
@@ -29,11 +35,16 @@ work_queue_url = "https://sqs.eu-north-1.amazonaws.com/543442417201/mycrawlerQue
 # Constants 
 REFRESH_INTERVAL = 3  # seconds (reduced for faster updates)
 HISTORY_LENGTH = 30    # Number of data points to track for trends
+RATE_BUCKET_SECONDS = 3  # one trend data point per bucket, however often the screen redraws
 INACTIVE_THRESHOLD = 90  # Seconds after which a node is considered inactive
 MAX_HEARTBEAT_AGE = 300  # Keep heartbeats in memory for this many seconds
 INITIAL_LOAD_TIME = 15  # Initial time to collect heartbeats before starting display
+CLEAR_SCREEN = "\033[H\033[2J"  # cursor home + erase display
+HEARTBEAT_WAIT_TIME = 20  # SQS long-poll wait used by the monitor threads
+QUEUE_STATS_INTERVAL = 20  # seconds between work queue attribute refreshes
 
 # State
+# last_seen is the heartbeat's HH:MM:SS, formatted once on receipt; the age is added at render time
 crawler_status = {}  # crawler_id -> {last_seen, crawled, uploaded, failed}
 indexer_status = {}  # indexer_id -> {last_seen, indexed}
 historical_data = {
@@ -41,8 +52,18 @@ historical_data = {
     "index_rates": deque(maxlen=HISTORY_LENGTH),
     "error_rates": deque(maxlen=HISTORY_LENGTH),
     "timestamps": deque(maxlen=HISTORY_LENGTH),
+    "buckets": deque(maxlen=HISTORY_LENGTH),
 }
 
+# Latest (visible, in_flight) work queue counts, refreshed by monitor_queue_stats
+queue_stats = (0, 0)
+
+# Running sums of the per-node counters, kept in step with crawler_status/indexer_status
+# so a refresh reads them in O(1) instead of summing over every node
+totals = {"crawled": 0, "uploaded": 0, "failed": 0, "indexed": 0}
+CRAWLER_TOTALS = ("crawled", "uploaded", "failed")
+INDEXER_TOTALS = ("indexed",)
+
 # Node health status tracking
 node_health = {
     "active_crawlers": 0,
@@ -51,6 +72,13 @@ node_health = {
     "inactive_indexers": 0,
 }
 
+# Nodes as (id, info) pairs, active first then by name; rebuilt by update_node_health
+node_order = {"crawlers": [], "indexers": []}
+
+# Set by the monitor threads whenever node state changes, so the display redraws
+# straight away instead of waiting out the refresh interval
+state_changed = threading.Event()
+
 # Debug mode
 debug_mode = False
 
@@ -100,22 +128,62 @@ def fetch_queue_stats():
         debug(f"Error getting queue stats: {e}")
         return 0, 0
 
+def monitor_queue_stats():
+    """Thread to refresh the work queue counts every QUEUE_STATS_INTERVAL seconds
+
+    The counts are approximate and change slowly, so rendering reads the last value
+    instead of calling get_queue_attributes on every refresh.
+    """
+    global queue_stats
+    debug(f"Starting queue stats monitor thread")
+    
+    while running:
+        queue_stats = fetch_queue_stats()
+        time.sleep(QUEUE_STATS_INTERVAL)
+
+# Each script runs standalone on its own node, so indexer.py carries an identical copy
+# of this decoder; keep the two in step
+def heartbeat_body(msg):
+    """Decode a heartbeat, preferring fields sent as message attributes over the JSON body"""
+    attributes = msg.get("MessageAttributes")
+    if attributes:
+        body = {}
+        for name, attribute in attributes.items():
+            value = attribute["StringValue"]
+            if attribute["DataType"].startswith("Number"):
+                value = int(value) if value.lstrip("-").isdigit() else float(value)
+            body[name] = value
+        return body
+    return orjson.loads(msg["Body"])
+
+def update_totals(old, new, fields):
+    """Apply the change between a node's previous and new status to the running totals"""
+    for field in fields:
+        totals[field] += (new[field] if new else 0) - (old[field] if old else 0)
+
 def calculate_rates():
     """Calculate performance rates based on collected data"""
     now = time.time()
     
-    # Calculate crawler performance
-    total_crawled = sum(info["crawled"] for info in crawler_status.values())
-    total_failed = sum(info["failed"] for info in crawler_status.values())
+    # Crawler and indexer totals are maintained as heartbeats arrive and expire
+    total_crawled = totals["crawled"]
+    total_failed = totals["failed"]
+    total_indexed = totals["indexed"]
     
-    # Calculate indexer performance
-    total_indexed = sum(info["indexed"] for info in indexer_status.values()) if indexer_status else 0
-    
-    # Track historical data for trends
-    historical_data["crawl_rates"].append(total_crawled)
-    historical_data["index_rates"].append(total_indexed)
-    historical_data["error_rates"].append(total_failed)
-    historical_data["timestamps"].append(now)
+    # Track historical data for trends. Redraws within the same time bucket refresh its
+    # data point rather than adding one, so the window always spans HISTORY_LENGTH buckets
+    bucket = int(now // RATE_BUCKET_SECONDS)
+    if historical_data["buckets"] and historical_data["buckets"][-1] == bucket:
+        historical_data["crawl_rates"][-1] = total_crawled
+        historical_data["index_rates"][-1] = total_indexed
+        historical_data["error_rates"][-1] = total_failed
+        historical_data["timestamps"][-1] = now
+    else:
+        historical_data["crawl_rates"].append(total_crawled)
+        historical_data["index_rates"].append(total_indexed)
+        historical_data["error_rates"].append(total_failed)
+        historical_data["timestamps"].append(now)
+        historical_data["buckets"].append(bucket)
     
     # Calculate rates if we have enough data points
     if len(historical_data["timestamps"]) >= 2:
@@ -140,8 +208,8 @@ def collect_initial_heartbeats():
     
     # Continue collecting until timeout
     while time.time() - start_time < INITIAL_LOAD_TIME:
-        crawler_count, _ = receive_and_process_crawler_heartbeats()
-        indexer_count, _ = receive_and_process_indexer_heartbeats()
+        crawler_count, _ = receive_and_process_crawler_heartbeats(wait_time=1)
+        indexer_count, _ = receive_and_process_indexer_heartbeats(wait_time=1)
         
         if crawler_count > 0 or indexer_count > 0:
             print(f"Found: {crawler_count} crawler and {indexer_count} indexer heartbeats")
@@ -150,15 +218,30 @@ def collect_initial_heartbeats():
         time.sleep(0.5)
     
     # After initial collection, show summary
-    active_crawlers = sum(1 for _, info in crawler_status.items() 
-                           if time.time() - info["timestamp"] <= INACTIVE_THRESHOLD)
-    active_indexers = sum(1 for _, info in indexer_status.items() 
-                           if time.time() - info["timestamp"] <= INACTIVE_THRESHOLD)
+    cutoff = time.time() - INACTIVE_THRESHOLD
+    active_crawlers = sum(1 for info in crawler_status.values() if info["timestamp"] >= cutoff)
+    active_indexers = sum(1 for info in indexer_status.values() if info["timestamp"] >= cutoff)
     
     print(f"{Fore.GREEN}Initial collection complete: Found {active_crawlers} active crawlers and {active_indexers} active indexers{Style.RESET_ALL}")
     time.sleep(1)  # Brief pause for user to read the message
 
-def receive_and_process_crawler_heartbeats():
+# Each script runs standalone on its own node, so master_node.py and indexer.py carry
+# their own copies of this helper (this one also reports how many were deleted)
+def delete_heartbeats(queue_url, messages):
+    """Delete up to 10 received messages in one call, return how many were deleted"""
+    entries = [{"Id": str(i), "ReceiptHandle": msg["ReceiptHandle"]} for i, msg in enumerate(messages)]
+    try:
+        response = sqs.delete_message_batch(QueueUrl=queue_url, Entries=entries)
+    except Exception as e:
+        debug(f"Error deleting heartbeat batch: {e}")
+        if args.log:
+            logging.error(f"Error deleting heartbeat batch: {e}")
+        return 0
+    for failure in response.get("Failed", []):
+        debug(f"Failed to delete heartbeat {failure['Id']}: {failure.get('Message')}")
+    return len(response.get("Successful", []))
+
+def receive_and_process_crawler_heartbeats(wait_time=HEARTBEAT_WAIT_TIME):
     """Receive and process crawler heartbeats, return count of processed messages"""
     heartbeats_found = 0
     deleted_count = 0
@@ -168,8 +251,9 @@ def receive_and_process_crawler_heartbeats():
         messages = sqs.receive_message(
             QueueUrl=crawler_queue_url, 
             MaxNumberOfMessages=10,  # Get multiple messages
-            WaitTimeSeconds=1,       # Short wait time
-            VisibilityTimeout=5      # Short visibility timeout
+            WaitTimeSeconds=wait_time,  # Long poll: returns as soon as a heartbeat arrives
+            VisibilityTimeout=5,     # Short visibility timeout
+            MessageAttributeNames=["All"]
         )
         
         if "Messages" in messages:
@@ -177,20 +261,22 @@ def receive_and_process_crawler_heartbeats():
             
             for msg in messages["Messages"]:
                 try:
-                    body = json.loads(msg["Body"])
+                    body = heartbeat_body(msg)
                     cid = body["crawler_id"]
                     
                     # Debug the raw heartbeat data
-                    debug(f"Crawler heartbeat from {cid}: {json.dumps(body)}")
+                    debug(f"Crawler heartbeat from {cid}: {orjson.dumps(body).decode()}")
                     
                     # Update or add crawler status
-                    crawler_status[cid] = {
+                    info = {
                         "timestamp": body["timestamp"],
                         "last_seen": datetime.fromtimestamp(body["timestamp"]).strftime("%H:%M:%S"),
                         "crawled": body["crawled"],
                         "uploaded": body["uploaded"],
                         "failed": body["failed"],
                     }
+                    update_totals(crawler_status.get(cid), info, CRAWLER_TOTALS)
+                    crawler_status[cid] = info
                     
                     heartbeats_found += 1
                     
@@ -201,13 +287,9 @@ def receive_and_process_crawler_heartbeats():
                     debug(f"Error processing crawler heartbeat: {e}")
                     if args.log:
                         logging.error(f"Error processing crawler heartbeat: {e}")
-                finally:
-                    # Always delete the message
-                    sqs.delete_message(
-                        QueueUrl=crawler_queue_url, 
-                        ReceiptHandle=msg["ReceiptHandle"]
-                    )
-                    deleted_count += 1
+            
+            # Always delete the messages, all of them in a single batch call
+            deleted_count = delete_heartbeats(crawler_queue_url, messages["Messages"])
                     
         return heartbeats_found, deleted_count
                     
@@ -217,7 +299,7 @@ def receive_and_process_crawler_heartbeats():
             logging.error(f"Error in crawler heartbeat receiver: {e}")
         return 0, 0
 
-def receive_and_process_indexer_heartbeats():
+def receive_and_process_indexer_heartbeats(wait_time=HEARTBEAT_WAIT_TIME):
     """Receive and process indexer heartbeats, return count of processed messages"""
     heartbeats_found = 0
     deleted_count = 0
@@ -227,8 +309,9 @@ def receive_and_process_indexer_heartbeats():
         messages = sqs.receive_message(
             QueueUrl=indexer_queue_url, 
             MaxNumberOfMessages=10,  # Get multiple messages
-            WaitTimeSeconds=1,       # Short wait time
-            VisibilityTimeout=5      # Short visibility timeout
+            WaitTimeSeconds=wait_time,  # Long poll: returns as soon as a heartbeat arrives
+            VisibilityTimeout=5,     # Short visibility timeout
+            MessageAttributeNames=["All"]
         )
         
         if "Messages" in messages:
@@ -236,18 +319,20 @@ def receive_and_process_indexer_heartbeats():
             
             for msg in messages["Messages"]:
                 try:
-                    body = json.loads(msg["Body"])
+                    body = heartbeat_body(msg)
                     iid = body["indexer_id"]
                     
                     # Debug the raw heartbeat data
-                    debug(f"Indexer heartbeat from {iid}: {json.dumps(body)}")
+                    debug(f"Indexer heartbeat from {iid}: {orjson.dumps(body).decode()}")
                     
                     # Update or add indexer status
-                    indexer_status[iid] = {
+                    info = {
                         "timestamp": body["timestamp"],
                         "last_seen": datetime.fromtimestamp(body["timestamp"]).strftime("%H:%M:%S"),
                         "indexed": body["indexed"]
                     }
+                    update_totals(indexer_status.get(iid), info, INDEXER_TOTALS)
+                    indexer_status[iid] = info
                     
                     heartbeats_found += 1
                     
@@ -258,13 +343,9 @@ def receive_and_process_indexer_heartbeats():
                     debug(f"Error processing indexer heartbeat: {e}")
                     if args.log:
                         logging.error(f"Error processing indexer heartbeat: {e}")
-                finally:
-                    # Always delete the message
-                    sqs.delete_message(
-                        QueueUrl=indexer_queue_url, 
-                        ReceiptHandle=msg["ReceiptHandle"]
-                    )
-                    deleted_count += 1
+            
+            # Always delete the messages, all of them in a single batch call
+            deleted_count = delete_heartbeats(indexer_queue_url, messages["Messages"])
                     
         return heartbeats_found, deleted_count
                     
@@ -285,6 +366,7 @@ def monitor_crawler_heartbeats():
             
             if heartbeats_found > 0:
                 debug(f"Processed {heartbeats_found} crawler heartbeats (deleted {deleted_count})")
+                state_changed.set()
                 
             # Clean up old heartbeats if not showing all
             if not args.all:
@@ -292,13 +374,12 @@ def monitor_crawler_heartbeats():
                 before_count = len(crawler_status)
                 for cid in list(crawler_status.keys()):
                     if now - crawler_status[cid]["timestamp"] > MAX_HEARTBEAT_AGE:
-                        del crawler_status[cid]
+                        update_totals(crawler_status.pop(cid), None, CRAWLER_TOTALS)
                 after_count = len(crawler_status)
                 if before_count != after_count:
                     debug(f"Cleaned up {before_count - after_count} expired crawler heartbeats")
+                    state_changed.set()
                         
-            # Small sleep to avoid high CPU usage
-            time.sleep(1)
             
         except Exception as e:
             debug(f"Error in crawler heartbeat monitor: {e}")
@@ -315,6 +396,7 @@ def monitor_indexer_heartbeats():
             
             if heartbeats_found > 0:
                 debug(f"Processed {heartbeats_found} indexer heartbeats (deleted {deleted_count})")
+                state_changed.set()
                 
             # Clean up old heartbeats if not showing all
             if not args.all:
@@ -322,56 +404,43 @@ def monitor_indexer_heartbeats():
                 before_count = len(indexer_status)
                 for iid in list(indexer_status.keys()):
                     if now - indexer_status[iid]["timestamp"] > MAX_HEARTBEAT_AGE:
-                        del indexer_status[iid]
+                        update_totals(indexer_status.pop(iid), None, INDEXER_TOTALS)
                 after_count = len(indexer_status)
                 if before_count != after_count:
                     debug(f"Cleaned up {before_count - after_count} expired indexer heartbeats")
+                    state_changed.set()
                         
-            # Small sleep to avoid high CPU usage
-            time.sleep(1)
             
         except Exception as e:
             debug(f"Error in indexer heartbeat monitor: {e}")
             time.sleep(5)  # Back off on errors
 
+def classify_nodes(status, cutoff):
+    """Mark nodes ACTIVE/INACTIVE in one pass, returning them active-first then by name"""
+    active, inactive = [], []
+    for node in sorted(list(status.items()), key=itemgetter(0)):
+        if node[1]["timestamp"] >= cutoff:
+            node[1]["status"] = "ACTIVE"
+            active.append(node)
+        else:
+            node[1]["status"] = "INACTIVE"
+            inactive.append(node)
+    return active, inactive
+
 def update_node_health():
     """Update node health status based on latest heartbeats"""
-    now = time.time()
-    active_crawlers = 0
-    inactive_crawlers = 0
-    
-    for cid, info in crawler_status.items():
-        if now - info["timestamp"] <= INACTIVE_THRESHOLD:
-            active_crawlers += 1
-            crawler_status[cid]["status"] = "ACTIVE"
-        else:
-            inactive_crawlers += 1
-            crawler_status[cid]["status"] = "INACTIVE"
-        
-        # Calculate time since last heartbeat
-        seconds_ago = int(now - info["timestamp"])
-        crawler_status[cid]["last_seen"] = f"{info['last_seen']} ({seconds_ago}s ago)"
-    
-    active_indexers = 0
-    inactive_indexers = 0
+    # One threshold timestamp instead of a subtraction per node
+    cutoff = time.time() - INACTIVE_THRESHOLD
+    active_crawlers, inactive_crawlers = classify_nodes(crawler_status, cutoff)
+    active_indexers, inactive_indexers = classify_nodes(indexer_status, cutoff)
     
-    for iid, info in indexer_status.items():
-        if now - info["timestamp"] <= INACTIVE_THRESHOLD:
-            active_indexers += 1
-            indexer_status[iid]["status"] = "ACTIVE"
-        else:
-            inactive_indexers += 1
-            indexer_status[iid]["status"] = "INACTIVE"
-        
-        # Calculate time since last heartbeat
-        seconds_ago = int(now - info["timestamp"])
-        indexer_status[iid]["last_seen"] = f"{info['last_seen']} ({seconds_ago}s ago)"
-    
-    # Update global health stats
-    node_health["active_crawlers"] = active_crawlers
-    node_health["inactive_crawlers"] = inactive_crawlers
-    node_health["active_indexers"] = active_indexers
-    node_health["inactive_indexers"] = inactive_indexers
+    # Update global health stats; the display walks the orderings without re-sorting
+    node_health["active_crawlers"] = len(active_crawlers)
+    node_health["inactive_crawlers"] = len(inactive_crawlers)
+    node_health["active_indexers"] = len(active_indexers)
+    node_health["inactive_indexers"] = len(inactive_indexers)
+    node_order["crawlers"] = active_crawlers + inactive_crawlers
+    node_order["indexers"] = active_indexers + inactive_indexers
 
 def display_dashboard():
     """Display the dashboard with all system information"""
@@ -379,6 +448,10 @@ def display_dashboard():
     
     try:
         while running:
+            # Clear before reading any state, so a heartbeat that lands while this frame
+            # is being drawn still wakes the wait below for the next one
+            state_changed.clear()
+
             # Update node health status
             update_node_health()
             
@@ -386,55 +459,53 @@ def display_dashboard():
             crawl_rate, index_rate, error_rate = calculate_rates()
             
             # Get queue stats
-            queue_visible, queue_in_flight = fetch_queue_stats()
+            queue_visible, queue_in_flight = queue_stats
+            now = time.time()
 
-            # Clear screen 
-            os.system('cls' if os.name == 'nt' else 'clear')
+            # Build the whole frame in memory and draw it with one write, starting
+            # with an ANSI home + clear instead of spawning a shell to clear the screen
+            frame = io.StringIO()
+            frame.write(CLEAR_SCREEN)
             
             # System summary with colors
-            print(f"{Back.BLUE}{Fore.WHITE}" + "=" * 70 + Style.RESET_ALL)
-            print(f"{Back.BLUE}{Fore.WHITE} 🌐 DISTRIBUTED WEB CRAWLER SYSTEM DASHBOARD {Style.RESET_ALL}")
-            print(f"{Back.BLUE}{Fore.WHITE}" + "=" * 70 + Style.RESET_ALL)
+            print(f"{Back.BLUE}{Fore.WHITE}" + "=" * 70 + Style.RESET_ALL, file=frame)
+            print(f"{Back.BLUE}{Fore.WHITE} 🌐 DISTRIBUTED WEB CRAWLER SYSTEM DASHBOARD {Style.RESET_ALL}", file=frame)
+            print(f"{Back.BLUE}{Fore.WHITE}" + "=" * 70 + Style.RESET_ALL, file=frame)
             
-            print(f"\n📊 {Fore.CYAN}SYSTEM OVERVIEW:{Style.RESET_ALL} {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            print(f"\n📊 {Fore.CYAN}SYSTEM OVERVIEW:{Style.RESET_ALL} {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", file=frame)
             
             # Show active nodes with color based on status
             if node_health['active_crawlers'] > 0 or node_health['active_indexers'] > 0:
-                print(f"  🖥️  {Fore.GREEN}Active Nodes: {node_health['active_crawlers']} crawlers, {node_health['active_indexers']} indexers{Style.RESET_ALL}")
+                print(f"  🖥️  {Fore.GREEN}Active Nodes: {node_health['active_crawlers']} crawlers, {node_health['active_indexers']} indexers{Style.RESET_ALL}", file=frame)
             else:
-                print(f"  🖥️  {Fore.YELLOW}Active Nodes: {node_health['active_crawlers']} crawlers, {node_health['active_indexers']} indexers{Style.RESET_ALL}")
+                print(f"  🖥️  {Fore.YELLOW}Active Nodes: {node_health['active_crawlers']} crawlers, {node_health['active_indexers']} indexers{Style.RESET_ALL}", file=frame)
             
             if node_health['inactive_crawlers'] > 0 or node_health['inactive_indexers'] > 0:
-                print(f"  ⚠️  {Fore.RED}Inactive Nodes: {node_health['inactive_crawlers']} crawlers, {node_health['inactive_indexers']} indexers{Style.RESET_ALL}")
+                print(f"  ⚠️  {Fore.RED}Inactive Nodes: {node_health['inactive_crawlers']} crawlers, {node_health['inactive_indexers']} indexers{Style.RESET_ALL}", file=frame)
             else:
-                print(f"  ⚠️  Inactive Nodes: {node_health['inactive_crawlers']} crawlers, {node_health['inactive_indexers']} indexers")
+                print(f"  ⚠️  Inactive Nodes: {node_health['inactive_crawlers']} crawlers, {node_health['inactive_indexers']} indexers", file=frame)
             
-            print(f"  📑 Queue Status: {queue_visible} visible, {queue_in_flight} in processing")
+            print(f"  📑 Queue Status: {queue_visible} visible, {queue_in_flight} in processing", file=frame)
             
             # Performance metrics with colors for error rate
-            print(f"\n📈 {Fore.CYAN}PERFORMANCE METRICS (per minute):{Style.RESET_ALL}")
-            print(f"  ⏩ Crawl Rate: {crawl_rate:.2f} pages/min")
-            print(f"  🔍 Index Rate: {index_rate:.2f} pages/min")
+            print(f"\n📈 {Fore.CYAN}PERFORMANCE METRICS (per minute):{Style.RESET_ALL}", file=frame)
+            print(f"  ⏩ Crawl Rate: {crawl_rate:.2f} pages/min", file=frame)
+            print(f"  🔍 Index Rate: {index_rate:.2f} pages/min", file=frame)
             
             if error_rate > 0.5:
-                print(f"  ❌ {Fore.RED}Error Rate: {error_rate:.2f} errors/min{Style.RESET_ALL}")
+                print(f"  ❌ {Fore.RED}Error Rate: {error_rate:.2f} errors/min{Style.RESET_ALL}", file=frame)
             else:
-                print(f"  ❌ Error Rate: {error_rate:.2f} errors/min")
+                print(f"  ❌ Error Rate: {error_rate:.2f} errors/min", file=frame)
             
             # Crawler details with colors
-            print(f"\n📊 {Fore.CYAN}CRAWLER NODES{Style.RESET_ALL}")
-            print("-" * 70)
+            print(f"\n📊 {Fore.CYAN}CRAWLER NODES{Style.RESET_ALL}", file=frame)
+            print("-" * 70, file=frame)
             
             if not crawler_status:
-                print(f"  {Fore.YELLOW}No crawler nodes detected.{Style.RESET_ALL}")
+                print(f"  {Fore.YELLOW}No crawler nodes detected.{Style.RESET_ALL}", file=frame)
             else:
-                # Sort crawlers by status (active first) then by name
-                sorted_crawlers = sorted(
-                    crawler_status.items(), 
-                    key=lambda x: (0 if x[1].get("status") == "ACTIVE" else 1, x[0])
-                )
-                
-                for cid, info in sorted_crawlers:
+                # Already ordered active first, then by name, by update_node_health
+                for cid, info in node_order["crawlers"]:
                     if info.get("status") == "ACTIVE":
                         status_emoji = "🟢"
                         color = Fore.GREEN
@@ -442,25 +513,20 @@ def display_dashboard():
                         status_emoji = "🔴"
                         color = Fore.RED
                         
-                    print(f"{color}{status_emoji} {cid}{Style.RESET_ALL}")
-                    print(f"  ⏱️  Last Seen: {info['last_seen']}")
-                    print(f"  ✅ Crawled: {info['crawled']} | ☁️ Uploaded: {info['uploaded']} | ❌ Failed: {info['failed']}")
-                    print("-" * 70)
+                    print(f"{color}{status_emoji} {cid}{Style.RESET_ALL}", file=frame)
+                    print(f"  ⏱️  Last Seen: {info['last_seen']} ({int(now - info['timestamp'])}s ago)", file=frame)
+                    print(f"  ✅ Crawled: {info['crawled']} | ☁️ Uploaded: {info['uploaded']} | ❌ Failed: {info['failed']}", file=frame)
+                    print("-" * 70, file=frame)
 
             # Indexer details with colors
-            print(f"\n📦 {Fore.CYAN}INDEXER NODES{Style.RESET_ALL}")
-            print("-" * 70)
+            print(f"\n📦 {Fore.CYAN}INDEXER NODES{Style.RESET_ALL}", file=frame)
+            print("-" * 70, file=frame)
             
             if not indexer_status:
-                print(f"  {Fore.YELLOW}No indexer nodes detected.{Style.RESET_ALL}")
+                print(f"  {Fore.YELLOW}No indexer nodes detected.{Style.RESET_ALL}", file=frame)
             else:
-                # Sort indexers by status (active first) then by name
-                sorted_indexers = sorted(
-                    indexer_status.items(), 
-                    key=lambda x: (0 if x[1].get("status") == "ACTIVE" else 1, x[0])
-                )
-                
-                for iid, info in sorted_indexers:
+                # Already ordered active first, then by name, by update_node_health
+                for iid, info in node_order["indexers"]:
                     if info.get("status") == "ACTIVE":
                         status_emoji = "🟢"
                         color = Fore.GREEN
@@ -468,23 +534,26 @@ def display_dashboard():
                         status_emoji = "🔴"
                         color = Fore.RED
                         
-                    print(f"{color}{status_emoji} {iid}{Style.RESET_ALL}")
-                    print(f"  ⏱️  Last Seen: {info['last_seen']}")
-                    print(f"  📚 Indexed: {info['indexed']}")
-                    print("-" * 70)
+                    print(f"{color}{status_emoji} {iid}{Style.RESET_ALL}", file=frame)
+                    print(f"  ⏱️  Last Seen: {info['last_seen']} ({int(now - info['timestamp'])}s ago)", file=frame)
+                    print(f"  📚 Indexed: {info['indexed']}", file=frame)
+                    print("-" * 70, file=frame)
 
             # Footer with dashboard controls
-            print(f"\n{Fore.CYAN}Dashboard Options:{Style.RESET_ALL}")
+            print(f"\n{Fore.CYAN}Dashboard Options:{Style.RESET_ALL}", file=frame)
             if args.all:
-                print(f"  📌 Showing all heartbeats, even old ones")
+                print(f"  📌 Showing all heartbeats, even old ones", file=frame)
             else:
-                print(f"  📌 Showing recent heartbeats only (last {MAX_HEARTBEAT_AGE}s)")
-            print(f"  🔁 Refreshing every {args.refresh} seconds... (Press Ctrl+C to exit)")
+                print(f"  📌 Showing recent heartbeats only (last {MAX_HEARTBEAT_AGE}s)", file=frame)
+            print(f"  🔁 Refreshing every {args.refresh} seconds... (Press Ctrl+C to exit)", file=frame)
             if debug_mode:
-                print(f"  🔧 Debug mode enabled")
+                print(f"  🔧 Debug mode enabled", file=frame)
+            
+            sys.stdout.write(frame.getvalue())
+            sys.stdout.flush()
             
-            # Wait for next refresh
-            time.sleep(args.refresh)
+            # Wait for the next refresh, or less if a heartbeat changed something
+            state_changed.wait(timeout=args.refresh)
             
     except KeyboardInterrupt:
         print(f"\n{Fore.YELLOW}🛑 Exiting dashboard.{Style.RESET_ALL}")
@@ -503,12 +572,15 @@ if __name__ == "__main__":
         # Start heartbeat monitoring threads
         crawler_thread = threading.Thread(target=monitor_crawler_heartbeats)
         indexer_thread = threading.Thread(target=monitor_indexer_heartbeats)
+        queue_stats_thread = threading.Thread(target=monitor_queue_stats)
         
         crawler_thread.daemon = True
         indexer_thread.daemon = True
+        queue_stats_thread.daemon = True
         
         crawler_thread.start()
         indexer_thread.start()
+        queue_stats_thread.start()
         
         # Start the dashboard display in the main thread
         display_dashboard()
@@ -1,87 +1,249 @@
 import os
 import boto3
 import logging
-from bs4 import BeautifulSoup
+from lxml import etree
 from whoosh.index import create_in, open_dir
 from whoosh.fields import Schema, TEXT, ID
 from whoosh.analysis import StemmingAnalyzer
-from whoosh.qparser import MultifieldParser
-from whoosh.qparser import MultifieldParser, QueryParser, OrGroup, AndGroup
-from whoosh import qparser
-from datetime import datetime
-from whoosh.qparser import OrGroup
+from whoosh.writing import MERGE_SMALL
 from whoosh.qparser import MultifieldParser, OrGroup, OperatorsPlugin
+from datetime import datetime, timedelta, timezone
 import tarfile
+import gzip
+import zlib
+import functools
 import socket
-import json
+import orjson
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.config import Config
+from boto3.s3.transfer import TransferConfig
 
 
 # Constants
 BUCKET_NAME = "distributed-crawler-data"
-INDEX_DIR = "indexdir"
+# Indexers split the bucket between them: run one per shard with INDEXER_SHARDS=N and
+# INDEXER_SHARD=0..N-1, each building its own index over a disjoint 1/N of the keys
+NUM_SHARDS = int(os.environ.get("INDEXER_SHARDS", "1"))
+SHARD = int(os.environ.get("INDEXER_SHARD", "0"))
+INDEX_DIR = "indexdir" if NUM_SHARDS == 1 else f"indexdir_shard{SHARD}"
 BACKUP_BUCKET = "distributed-index-backups"
-LOG_FILE = "indexed_files.log"
+LOG_FILE = "indexed_files.log"  # legacy dedup log; still read, no longer written
 INDEXER_ID = socket.gethostname()
 HEARTBEAT_QUEUE_URL = "https://sqs.eu-north-1.amazonaws.com/543442417201/myindexerHeartbeat"
 CRAWLER_HEARTBEAT_QUEUE_URL = "https://sqs.eu-north-1.amazonaws.com/543442417201/mycrawlerHeartbeat"
 HEARTBEAT_INTERVAL = 60  # Send heartbeat every 60 seconds
+INGEST_WORKERS = 32  # concurrent S3 downloads while ingesting
+STEM_CACHE_SIZE = 200000  # distinct words whose stems are memoized
+MAX_TOKEN_SIZE = 40  # longer "words" (base64, hashes, minified junk) are not indexed
+WRITER_PROCS = max(1, (os.cpu_count() or 1) - 1)  # processes building index segments
+WRITER_LIMIT_MB = 512  # RAM each writer process buffers postings in before flushing
+PARSE_CHUNK_SIZE = 64 * 1024  # bytes fed to the HTML parser per read
+BACKUP_PART_SIZE = 8 * 1024 * 1024  # multipart chunk for streamed index backups
+COMMIT_EVERY = 10000  # documents per checkpoint commit during a long ingest
+CHECKPOINT_SKEW = 300  # seconds the ingest checkpoint is set back from the listing start
 
-# AWS clients
-s3 = boto3.client("s3", region_name="eu-north-1")
-sqs = boto3.client("sqs", region_name="eu-north-1")
+# AWS clients share one session and config: adaptive retries back off under throttling,
+# and the pool is sized so every ingest worker keeps its own kept-alive connection
+aws_config = Config(
+    max_pool_connections=INGEST_WORKERS,
+    retries={"mode": "adaptive", "max_attempts": 10},
+    tcp_keepalive=True
+)
+session = boto3.Session(region_name="eu-north-1")
+backup_transfer_config = TransferConfig(
+    multipart_threshold=BACKUP_PART_SIZE, multipart_chunksize=BACKUP_PART_SIZE, max_concurrency=8
+)
+
+# Clients and the index are built on first use, so importing this module (user.py does,
+# for the search prompt) costs nothing until a code path actually needs them
+@functools.lru_cache(maxsize=1)
+def get_s3():
+    return session.client("s3", config=aws_config)
+
+@functools.lru_cache(maxsize=1)
+def get_sqs():
+    return session.client("sqs", config=aws_config)
 
 # Logging setup
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Global variables for stats
 indexed_count = 0
-heartbeat_running = True
+stop_heartbeat = threading.Event()
 
-# Whoosh schema
+# Whoosh schema; title and content share one analyzer so they share its stem cache
 def create_schema():
+    analyzer = StemmingAnalyzer(maxsize=MAX_TOKEN_SIZE, cachesize=STEM_CACHE_SIZE)
     return Schema(
         url=ID(stored=True, unique=True),
-        title=TEXT(stored=True, analyzer=StemmingAnalyzer()),
-        content=TEXT(stored=True, analyzer=StemmingAnalyzer())
+        key=ID(),  # S3 object the document came from; the index is its own dedup record
+        title=TEXT(stored=True, analyzer=analyzer),
+        content=TEXT(analyzer=analyzer)  # searched, never displayed: not stored
     )
 
-# Ensure indexdir exists
-schema = create_schema()
-if not os.path.exists(INDEX_DIR):
-    os.mkdir(INDEX_DIR)
-    ix = create_in(INDEX_DIR, schema)
-else:
+@functools.lru_cache(maxsize=1)
+def get_index():
+    """Open the index, creating indexdir on first run"""
+    if not os.path.exists(INDEX_DIR):
+        os.mkdir(INDEX_DIR)
+        return create_in(INDEX_DIR, create_schema())
     ix = open_dir(INDEX_DIR)
+    if "key" not in ix.schema.names():
+        # Indexes built before keys were recorded in the index itself
+        key_writer = ix.writer()
+        key_writer.add_field("key", ID())
+        key_writer.commit()
+    return ix
+
+# Already indexed keys: every key in the index, plus the legacy local log if present.
+# Keeping them in the index means they commit atomically with the documents and travel
+# with index backups, so a restored or second indexer knows what is already done.
+class IndexedKeys:
+    """Membership test against the index's "key" terms, without loading them into memory
+
+    A lookup is one probe of the on-disk term dictionary, so startup memory no longer
+    grows with the size of the corpus. Reads a snapshot taken when it is created.
+    """
+
+    def __init__(self):
+        self.reader = get_index().reader()
+        self.legacy = set()
+        if os.path.exists(LOG_FILE):
+            with open(LOG_FILE, "r") as f:
+                self.legacy.update(f.read().split())
+
+    def __contains__(self, key):
+        return ("key", key) in self.reader or key in self.legacy
+
+    def has_url(self, url):
+        return ("url", url) in self.reader
+
+    def close(self):
+        self.reader.close()
+
+def charset_from_content_type(content_type):
+    """Return the charset parameter of a Content-Type header, or None"""
+    for param in (content_type or "").split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            return value.strip().strip("\"'") or None
+    return None
+
+class TitleAndTextExtractor:
+    """lxml parser target: collects title and visible text as events arrive, building no tree"""
+
+    def __init__(self):
+        self.title = None
+        self.h1 = None
+        self.texts = []
+        self.buffer = []
+        self.skip_depth = 0  # inside <script>/<style>
+        self.seen_element = False
 
-# Load already indexed keys
-def load_indexed_keys():
-    if os.path.exists(LOG_FILE):
-        with open(LOG_FILE, "r") as f:
-            return set(line.strip() for line in f.readlines())
-    return set()
+    def flush(self):
+        if self.buffer:
+            text = "".join(self.buffer).strip()
+            if text:
+                self.texts.append(text)
+            self.buffer = []
 
-def mark_as_indexed(key):
-    with open(LOG_FILE, "a") as f:
-        f.write(key + "\n")
+    def start(self, tag, attrib):
+        self.flush()
+        self.seen_element = True
+        if tag in ("script", "style"):
+            self.skip_depth += 1
+        elif tag == "title" and self.title is None:
+            self.title = []
+        elif tag == "h1" and self.h1 is None:
+            self.h1 = []
+
+    def end(self, tag):
+        self.flush()
+        if tag in ("script", "style") and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag == "title" and isinstance(self.title, list):
+            self.title = "".join(self.title)
+        elif tag == "h1" and isinstance(self.h1, list):
+            self.h1 = "".join(self.h1)
+
+    def data(self, data):
+        if self.skip_depth:
+            return
+        self.buffer.append(data)
+        if isinstance(self.title, list):
+            self.title.append(data)
+        if isinstance(self.h1, list):
+            self.h1.append(data)
+
+    def close(self):
+        self.flush()
+        return self
+
+def html_parser(encoding=None):
+    target = TitleAndTextExtractor()
+    try:
+        return etree.HTMLParser(target=target, encoding=encoding, remove_comments=True, remove_pis=True)
+    except LookupError:
+        # Unknown charset name: let libxml2 sniff <meta charset> instead
+        return etree.HTMLParser(target=target, remove_comments=True, remove_pis=True)
+
+def extract_text_from_html(html, url="unknown", encoding=None):
+    """Return (title, text) for a page given as a binary stream, raw bytes or str
+
+    Streams are fed to lxml in chunks and parsed into title and text in a single pass,
+    so neither the whole body nor a DOM is ever held in memory. lxml decodes the bytes
+    itself, so no Python-side decode is needed.
+    """
+    if isinstance(html, str):
+        html, encoding = html.encode("utf-8"), "utf-8"
+    parser = html_parser(encoding)
+    try:
+        if hasattr(html, "read"):
+            for chunk in iter(lambda: html.read(PARSE_CHUNK_SIZE), b""):
+                parser.feed(chunk)
+        elif html:
+            parser.feed(html)
+        extractor = parser.close()
+    except etree.LxmlError:
+        extractor = None
+    if extractor is None or not extractor.seen_element:
+        logging.warning(f"⚠️ Empty document for {url}")
+        return "No Title", ""
 
-def extract_text_from_html(html, url="unknown"):
-    soup = BeautifulSoup(html, "html.parser")
     title = "No Title"
-    if soup.title and soup.title.string:
-        title = soup.title.string.strip()
+    if isinstance(extractor.title, str) and extractor.title.strip():
+        title = extractor.title.strip()
+    elif isinstance(extractor.h1, str) and extractor.h1.strip():
+        title = extractor.h1.strip()
     else:
-        h1 = soup.find("h1")
-        if h1 and h1.string:
-            title = h1.string.strip()
-        else:
-            logging.warning(f"⚠️ No title found for {url}")
+        logging.warning(f"⚠️ No title found for {url}")
+
+    return title, " ".join(extractor.texts)
 
-    for tag in soup(["script", "style"]):
-        tag.decompose()
-    content = soup.get_text(separator=" ", strip=True)
-    return title, content
+def heartbeat_attributes(heartbeat):
+    """SQS message attributes carrying each heartbeat field"""
+    return {
+        name: {"DataType": "Number", "StringValue": str(value)}
+        if isinstance(value, (int, float)) else {"DataType": "String", "StringValue": str(value)}
+        for name, value in heartbeat.items()
+    }
+
+# Each script runs standalone on its own node, so dashboard.py carries an identical copy
+# of this decoder; keep the two in step
+def heartbeat_body(msg):
+    """Decode a heartbeat, preferring fields sent as message attributes over the JSON body"""
+    attributes = msg.get("MessageAttributes")
+    if attributes:
+        body = {}
+        for name, attribute in attributes.items():
+            value = attribute["StringValue"]
+            if attribute["DataType"].startswith("Number"):
+                value = int(value) if value.lstrip("-").isdigit() else float(value)
+            body[name] = value
+        return body
+    return orjson.loads(msg["Body"])
 
 def send_indexer_heartbeat(indexed_count):
     try:
@@ -91,105 +253,221 @@ def send_indexer_heartbeat(indexed_count):
             "status": "alive",
             "indexed": indexed_count
         }
-        sqs.send_message(
+        # Fields also ride as message attributes so readers need not parse the body;
+        # the JSON body stays for readers that predate them (SQS requires a body anyway)
+        get_sqs().send_message(
             QueueUrl=HEARTBEAT_QUEUE_URL,
-            MessageBody=json.dumps(heartbeat)
+            MessageBody=orjson.dumps(heartbeat).decode(),
+            MessageAttributes=heartbeat_attributes(heartbeat)
         )
         # Removed heartbeat sent message
     except Exception as e:
         logging.error(f"❌ Failed to send indexer heartbeat: {e}")
 
 def heartbeat_thread():
-    """Thread to send regular heartbeats"""
-    global indexed_count, heartbeat_running
-    
+    """Send a heartbeat every HEARTBEAT_INTERVAL until stop_heartbeat is set"""
     logging.info("🕒 Starting regular heartbeat thread")
-    
-    while heartbeat_running:
-        try:
-            send_indexer_heartbeat(indexed_count)
-            time.sleep(HEARTBEAT_INTERVAL)
-        except Exception as e:
-            logging.error(f"❌ Error in heartbeat thread: {e}")
-            time.sleep(5)  # Back off on errors
+    # Event.wait doubles as the interval timer and returns at once on shutdown;
+    # send_indexer_heartbeat already logs and swallows its own failures
+    send_indexer_heartbeat(indexed_count)
+    while not stop_heartbeat.wait(HEARTBEAT_INTERVAL):
+        send_indexer_heartbeat(indexed_count)
+
+def fetch_and_extract(key):
+    """Download one crawled page and pull out its url, title and text (runs in a worker thread)"""
+    response = get_s3().get_object(Bucket=BUCKET_NAME, Key=key)
+    body = response["Body"]
+    # Crawlers upload gzip-compressed pages; older objects are plain HTML.
+    # Decompression streams from the socket into the parser chunk by chunk.
+    if response.get("ContentEncoding") == "gzip":
+        body = gzip.GzipFile(fileobj=body)
+    # Raw bytes go straight to lxml: the header charset if given, else <meta charset>
+    charset = charset_from_content_type(response.get("ContentType"))
+    url = response["Metadata"].get("original-url", key)
+    with body:
+        title, content = extract_text_from_html(body, url, charset)
+    return url, title, content
+
+# Time the last completed ingest's listing started (less CHECKPOINT_SKEW); kept inside
+# the index directory so it is backed up and restored together with the index it describes
+def checkpoint_path():
+    return os.path.join(INDEX_DIR, "ingest_checkpoint.json")
+
+def load_checkpoint():
+    if not os.path.exists(checkpoint_path()):
+        return None
+    with open(checkpoint_path(), "rb") as f:
+        return datetime.fromisoformat(orjson.loads(f.read())["last_modified"])
+
+def save_checkpoint(last_modified):
+    with open(checkpoint_path(), "wb") as f:
+        f.write(orjson.dumps({"last_modified": last_modified}))
+
+def owns_key(key):
+    """True if this indexer's shard is responsible for the given S3 key"""
+    return NUM_SHARDS == 1 or zlib.crc32(key.encode()) % NUM_SHARDS == SHARD
+
+def open_bulk_writer():
+    """Writer tuned for bulk ingest: large RAM buffer, parallel segment builds, merges deferred"""
+    return get_index().writer(procs=WRITER_PROCS, limitmb=WRITER_LIMIT_MB, multisegment=True)
+
+def merge_small_segments():
+    """Fold the small segments left by bulk ingest together so searches open fewer files"""
+    writer = get_index().writer()
+    writer.commit(mergetype=MERGE_SMALL)
 
 def ingest_from_s3():
     global indexed_count
-    already_indexed = load_indexed_keys()
+    already_indexed = IndexedKeys()
+    checkpoint = load_checkpoint()
+    # Crawlers keep writing while the bucket is listed in key order, so an object rewritten
+    # behind the cursor can carry a LastModified older than keys listed later. Only the
+    # listing's start time is safe to resume from: every change after it is seen next run.
+    # The skew margin covers clock drift against S3 and PUTs in flight at the start.
+    next_checkpoint = datetime.now(timezone.utc) - timedelta(seconds=CHECKPOINT_SKEW)
 
     try:
-        objects = s3.list_objects_v2(Bucket=BUCKET_NAME).get("Contents", [])
-        writer = ix.writer()
-        for obj in objects:
-            key = obj["Key"]
-            if key in already_indexed:
-                logging.info(f"⏩ Skipping already indexed: {key}")
-                continue
-
-            try:
-                response = s3.get_object(Bucket=BUCKET_NAME, Key=key)
-                html = response["Body"].read().decode("utf-8")
-                url = response["Metadata"].get("original-url", key)
-                title, content = extract_text_from_html(html, url)
-                writer.update_document(url=url, title=title, content=content)
-
-                indexed_count += 1
-                mark_as_indexed(key)
-                logging.info(f"✅ Indexed: {url} | Title: {title}")
-            except Exception as e:
-                logging.error(f"❌ Failed to process {key}: {e}")
+        # A single list_objects_v2 call stops at 1000 keys; page through the whole bucket
+        paginator = get_s3().get_paginator("list_objects_v2")
+        pages = paginator.paginate(Bucket=BUCKET_NAME, PaginationConfig={"PageSize": 1000})
+        writer = open_bulk_writer()
+        # Documents that cannot already be in the index go in with add_document, skipping
+        # update_document's delete-by-url search; a URL is only indexed once per run
+        seen_urls = set()
+        pending = 0  # documents added since the last commit
+        # Downloads overlap in the pool; only this thread touches the (non thread-safe) writer.
+        # Work is submitted one listing page at a time so at most 1000 pages sit in memory.
+        with ThreadPoolExecutor(max_workers=INGEST_WORKERS) as executor:
+            for page in pages:
+                futures = {}
+                for obj in page.get("Contents", []):
+                    key = obj["Key"]
+                    if not owns_key(key):
+                        continue
+                    modified = obj["LastModified"]
+                    # Keys are URL digests, so a re-crawled page overwrites its object:
+                    # an indexed key is only fetched again if it changed since last run
+                    if key in already_indexed and (checkpoint is None or modified <= checkpoint):
+                        logging.info(f"⏩ Skipping already indexed: {key}")
+                        continue
+                    futures[executor.submit(fetch_and_extract, key)] = key, modified
+
+                for future in as_completed(futures):
+                    key, modified = futures[future]
+                    try:
+                        url, title, content = future.result()
+                        if url in seen_urls:
+                            continue
+                        seen_urls.add(url)
+                        # Keys are URL digests, so only a changed object (or a page stored
+                        # under an older key scheme) replaces an existing document
+                        if key in already_indexed or already_indexed.has_url(url):
+                            writer.update_document(url=url, key=key, title=title, content=content)
+                        else:
+                            writer.add_document(url=url, key=key, title=title, content=content)
+
+                        indexed_count += 1
+                        pending += 1
+                        logging.info(f"✅ Indexed: {url} | Title: {title}")
+                    except Exception as e:
+                        logging.error(f"❌ Failed to process {key}: {e}")
+                        # Keep the checkpoint behind this object so the next run retries it
+                        next_checkpoint = min(next_checkpoint, modified - timedelta(seconds=1))
+
+                # Bounded checkpoint: a crash in a huge backlog loses at most COMMIT_EVERY docs
+                if pending >= COMMIT_EVERY:
+                    writer.commit()
+                    logging.info(f"💾 Checkpoint committed: {indexed_count} indexed so far")
+                    pending = 0
+                    writer = open_bulk_writer()
 
         writer.commit()
+        if checkpoint is not None:
+            # Never move backwards: a failed key older than the last checkpoint was either
+            # never indexed (always fetched) or unchanged (nothing to retry)
+            next_checkpoint = max(next_checkpoint, checkpoint)
+        save_checkpoint(next_checkpoint)
+        if indexed_count:
+            merge_small_segments()
+            logging.info("🧩 Merged small index segments")
         logging.info(f"📦 Total indexed this session: {indexed_count}")
         send_indexer_heartbeat(indexed_count)
 
     except Exception as e:
         logging.error(f"❌ Indexing failed: {e}")
+    finally:
+        already_indexed.close()
+
+def write_index_archive(pipe_w, errors):
+    """Tar and gzip the index into the write end of a pipe (runs in its own thread)"""
+    try:
+        with os.fdopen(pipe_w, "wb") as out, tarfile.open(fileobj=out, mode="w|gz") as tar:
+            tar.add(INDEX_DIR, arcname=os.path.basename(INDEX_DIR))
+    except Exception as e:
+        errors.append(e)
 
 def backup_indexdir_to_s3():
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     archive_name = f"indexdir_backup_{timestamp}.tar.gz"
+    # The archive streams straight from the tar thread into a multipart upload: no temp file
+    pipe_r, pipe_w = os.pipe()
+    errors = []
+    archiver = threading.Thread(target=write_index_archive, args=(pipe_w, errors), daemon=True)
+    archiver.start()
     try:
-        with tarfile.open(archive_name, "w:gz") as tar:
-            tar.add(INDEX_DIR, arcname=os.path.basename(INDEX_DIR))
-
-        s3.upload_file(archive_name, BACKUP_BUCKET, archive_name)
+        with os.fdopen(pipe_r, "rb") as archive:
+            get_s3().upload_fileobj(archive, BACKUP_BUCKET, archive_name, Config=backup_transfer_config)
+        archiver.join()
+        if errors:
+            # The upload finished on a truncated stream; don't leave a broken backup behind
+            get_s3().delete_object(Bucket=BACKUP_BUCKET, Key=archive_name)
+            raise errors[0]
         logging.info(f"☁️ Index backup uploaded to S3: {archive_name}")
-        os.remove(archive_name)
     except Exception as e:
         logging.error(f"❌ Failed to upload index backup: {e}")
 
+# Each script runs standalone on its own node, so master_node.py and dashboard.py carry
+# their own copies of this helper
+def delete_heartbeats(queue_url, messages):
+    """Delete up to 10 received heartbeat messages in one call"""
+    entries = [{"Id": str(i), "ReceiptHandle": msg["ReceiptHandle"]} for i, msg in enumerate(messages)]
+    response = get_sqs().delete_message_batch(QueueUrl=queue_url, Entries=entries)
+    for failure in response.get("Failed", []):
+        logging.warning(f"⚠️ Failed to delete heartbeat {failure['Id']}: {failure.get('Message')}")
+
 def show_status():
     try:
         print("\n📡 CRAWLER STATUS:")
-        crawler_msgs = sqs.receive_message(
+        crawler_msgs = get_sqs().receive_message(
             QueueUrl=CRAWLER_HEARTBEAT_QUEUE_URL,
             MaxNumberOfMessages=10,
-            WaitTimeSeconds=1
+            WaitTimeSeconds=1,
+            MessageAttributeNames=["All"]
         )
         if "Messages" in crawler_msgs:
             for msg in crawler_msgs["Messages"]:
-                body = json.loads(msg["Body"])
+                body = heartbeat_body(msg)
                 print(f"🖥️  {body['crawler_id']}")
                 print(f"   ⏱️ Last Seen: {datetime.fromtimestamp(body['timestamp']).strftime('%H:%M:%S')}")
                 print(f"   ✅ Crawled: {body['crawled']} | ☁️ Uploaded: {body['uploaded']} | ❌ Failed: {body['failed']}")
-                sqs.delete_message(QueueUrl=CRAWLER_HEARTBEAT_QUEUE_URL, ReceiptHandle=msg["ReceiptHandle"])
+            delete_heartbeats(CRAWLER_HEARTBEAT_QUEUE_URL, crawler_msgs["Messages"])
         else:
             print("No active crawler heartbeat messages.")
 
         print("\n🧠 INDEXER STATUS:")
-        indexer_msgs = sqs.receive_message(
+        indexer_msgs = get_sqs().receive_message(
             QueueUrl=HEARTBEAT_QUEUE_URL,
-            MaxNumberOfMessages=1,
-            WaitTimeSeconds=1
+            MaxNumberOfMessages=10,
+            WaitTimeSeconds=1,
+            MessageAttributeNames=["All"]
         )
         if "Messages" in indexer_msgs:
             for msg in indexer_msgs["Messages"]:
-                body = json.loads(msg["Body"])
+                body = heartbeat_body(msg)
                 print(f"🖥️  {body['indexer_id']}")
                 print(f"   ⏱️ Last Seen: {datetime.fromtimestamp(body['timestamp']).strftime('%H:%M:%S')}")
                 print(f"   🗂️ Indexed: {body['indexed']}")
-                sqs.delete_message(QueueUrl=HEARTBEAT_QUEUE_URL, ReceiptHandle=msg["ReceiptHandle"])
+            delete_heartbeats(HEARTBEAT_QUEUE_URL, indexer_msgs["Messages"])
         else:
             print("No active indexer heartbeat messages.")
         print()
@@ -204,9 +482,13 @@ def interactive_search():
     print("Type 'quit' to exit.\n")
 
     try:
+        ix = get_index()
         with ix.searcher() as searcher:
             parser = MultifieldParser(["title", "content"], schema=ix.schema, group=OrGroup.factory(0.9))
             parser.add_plugin(OperatorsPlugin())  # ✅ Enables AND, OR, NOT
+            # Throwaway query: opens every segment's term index and loads the field-length
+            # tables BM25 scores with, so the user's first search doesn't pay for it
+            searcher.search(parser.parse("warmup"), limit=1)
             while True:
                 try:
                     query_str = input("Search > ").strip()
@@ -251,5 +533,5 @@ if __name__ == "__main__":
         logging.info("👋 Indexer stopping")
     finally:
         # Ensure clean shutdown
-        heartbeat_running = False
+        stop_heartbeat.set()
         logging.info("💤 Indexer shutting down")
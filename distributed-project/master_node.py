@@ -1,32 +1,104 @@
 import boto3
+from botocore.config import Config
 import logging
-import json
+import orjson
 import time
 import threading
-import queue
-import urllib.parse
+import re
+from urllib.parse import uses_params
+import functools
+import sqlite3
+import sched
 
 # Setup
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-# AWS Clients
-sqs = boto3.client("sqs", region_name="eu-north-1")
-s3 = boto3.client("s3")
-
 # Constants
 CRAWLER_QUEUE_URL = "https://sqs.eu-north-1.amazonaws.com/543442417201/mycrawlerQueue"
 HEARTBEAT_QUEUE_URL = "https://sqs.eu-north-1.amazonaws.com/543442417201/mycrawlerHeartbeat"
 INDEXER_HEARTBEAT_QUEUE_URL = "https://sqs.eu-north-1.amazonaws.com/543442417201/myindexerHeartbeat"
 BUCKET_NAME = "distributed-crawler-data"
-MAX_QUEUE_SIZE = 1000
 TASK_TIMEOUT = 180  # seconds
+TASK_TTL = 24 * 3600  # seconds a URL is remembered; after that it may be crawled again
+MASTER_DB = "master.db"  # crawl state, so a restarted master resumes instead of re-crawling
+TIMEOUT_CHECK_INTERVAL = 15  # seconds between scans for timed-out tasks
+HEALTH_CHECK_INTERVAL = 30  # seconds between crawler health checks
+STATS_INTERVAL = 60  # seconds between stats reports
+CRAWLER_TIMEOUT = 90  # seconds without a heartbeat before a crawler counts as failed
+# SQS long-poll maximum; message and system attributes are left unrequested (the default)
+# since the monitors only read Body and ReceiptHandle
+HEARTBEAT_WAIT_TIME = 20
+HEARTBEAT_RECEIVERS = 4  # concurrent long-poll loops per heartbeat queue
+SQS_BATCH_SIZE = 10  # SendMessageBatch maximum
+SEND_ATTEMPTS = 3  # tries for batch entries SQS reports as failed on its side
+
+# AWS Clients
+# One pooled connection per heartbeat receiver plus headroom for sends; adaptive retries
+# back off when SQS throttles, and keep-alive holds the long-poll connections open
+sqs = boto3.client("sqs", region_name="eu-north-1", config=Config(
+    max_pool_connections=2 * HEARTBEAT_RECEIVERS + 8,
+    retries={"mode": "adaptive", "max_attempts": 10},
+    tcp_keepalive=True
+))
+
+def send_url_messages(messages):
+    """Send (url, body) pairs to the crawler queue, SQS_BATCH_SIZE per call
+
+    Entries that fail on the SQS side are retried; returns the urls that were sent.
+    """
+    sent = []
+    for start in range(0, len(messages), SQS_BATCH_SIZE):
+        pending = messages[start:start + SQS_BATCH_SIZE]
+        for attempt in range(SEND_ATTEMPTS):
+            entries = [{"Id": str(i), "MessageBody": body} for i, (_, body) in enumerate(pending)]
+            try:
+                response = sqs.send_message_batch(QueueUrl=CRAWLER_QUEUE_URL, Entries=entries)
+            except Exception as e:
+                logging.error("❌ Failed to send batch of %s URLs: %s", len(pending), e)
+                break
+            sent.extend(pending[int(ok["Id"])][0] for ok in response.get("Successful", []))
+            retry = []
+            for failure in response.get("Failed", []):
+                url = pending[int(failure["Id"])][0]
+                if failure.get("SenderFault"):
+                    logging.error("❌ Failed to send URL to queue: %s, %s", url, failure.get('Message'))
+                else:
+                    retry.append(pending[int(failure["Id"])])
+            pending = retry
+            if not pending:
+                break
+        for url, _ in pending:
+            logging.error("❌ Failed to send URL to queue: %s", url)
+    return sent
+
+# Each script runs standalone on its own node, so indexer.py and dashboard.py carry
+# their own copies of this helper
+def delete_heartbeats(queue_url, messages):
+    """Delete up to 10 received heartbeat messages in one call"""
+    entries = [{"Id": str(i), "ReceiptHandle": msg["ReceiptHandle"]} for i, msg in enumerate(messages)]
+    response = sqs.delete_message_batch(QueueUrl=queue_url, Entries=entries)
+    for failure in response.get("Failed", []):
+        logging.warning("⚠️ Failed to delete heartbeat %s: %s", failure['Id'], failure.get('Message'))
 
 class MasterNode:
     def __init__(self):
-        self.url_queue = queue.Queue(maxsize=MAX_QUEUE_SIZE)
-        self.visited_urls = set()
-        self.task_status = {}  # url -> {timestamp, status}
+        # Every known URL lives in the tasks table: its primary key is the visited set, and
+        # the (status, ts) index finds timed-out tasks without scanning the others
+        self.db = sqlite3.connect(MASTER_DB, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS tasks("
+                "url TEXT PRIMARY KEY, status TEXT, ts REAL, created REAL)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_ts ON tasks(status, ts)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created)")
+        # Guards the shared connection and stats, which the submitting thread and the
+        # monitor threads all update
+        self.task_lock = threading.Lock()
         self.crawler_status = {}  # crawler_id -> last_heartbeat_time
+        self.status_lock = threading.Lock()  # heartbeat receivers write crawler_status concurrently
         self.stats = {"total_urls": 0, "requeued": 0, "active_crawlers": 0, "failed_crawlers": 0}
         self.seed_urls = []  # Store seed URLs
 
@@ -41,149 +113,189 @@ class MasterNode:
         if source == "seed":
             self.seed_urls.extend(urls)
             
-        for url in urls:
-            # Normalize URL to avoid duplicates
-            url = normalize_url(url)
-            
-            if url not in self.visited_urls:
-                self.visited_urls.add(url)
-                message = json.dumps({
-                    "url": url,
-                    "depth": depth,
-                    "depth_limit": depth_limit,
-                    "restrict_domain": restrict_domain
-                })
-                try:
-                    sqs.send_message(QueueUrl=CRAWLER_QUEUE_URL, MessageBody=message)
-                    self.task_status[url] = {"timestamp": time.time(), "status": "queued"}
-                    self.stats["total_urls"] += 1
-                    
-                    # Log with source information for better tracking
-                    if source == "user":
-                        logging.info(f"👤 User submitted URL to queue: {url}")
-                    else:
-                        logging.info(f"✅ Sent URL to queue: {url}")
-                        
-                except Exception as e:
-                    logging.error(f"❌ Failed to send URL to queue: {url}, {str(e)}")
-            else:
-                logging.info(f"⏭️ Skipping already visited URL: {url}")
+        messages = []
+        now = time.time()
+        with self.task_lock, self.db:
+            for url in urls:
+                # Normalize URL to avoid duplicates
+                url = normalize_url(url)
+
+                # Only a URL the table has never seen gets inserted
+                if self.db.execute(
+                    "INSERT OR IGNORE INTO tasks VALUES (?, 'pending', ?, ?)", (url, now, now)
+                ).rowcount:
+                    messages.append((url, orjson.dumps({
+                        "url": url,
+                        "depth": depth,
+                        "depth_limit": depth_limit,
+                        "restrict_domain": restrict_domain
+                    }).decode()))
+                else:
+                    # Per-URL lines are DEBUG with lazy %-args: with INFO logging, big batches
+                    # neither flood the log nor pay for formatting lines that are dropped
+                    logging.debug("⏭️ Skipping already visited URL: %s", url)
+
+        sent = send_url_messages(messages)
+        self.mark_queued(sent, "total_urls")
+        unsent = set(url for url, _ in messages).difference(sent)
+        if unsent:
+            # Forget URLs that never reached the queue so they can be submitted again
+            with self.task_lock, self.db:
+                self.db.executemany("DELETE FROM tasks WHERE url = ?", [(url,) for url in unsent])
+        for url in sent:
+            logging.debug("✅ Sent URL to queue: %s", url)
+        # Log with source information for better tracking
+        skipped = len(urls) - len(messages)
+        if source == "user":
+            logging.info("👤 User submitted %s URLs to queue (%s already visited)", len(sent), skipped)
+        else:
+            logging.info("✅ Sent %s URLs to queue (%s already visited)", len(sent), skipped)
+
+    def mark_queued(self, urls, counter):
+        """Record urls as queued as of now and count them in stats[counter]"""
+        now = time.time()
+        with self.task_lock, self.db:
+            self.db.executemany(
+                "UPDATE tasks SET status = 'queued', ts = ? WHERE url = ?", [(now, url) for url in urls]
+            )
+            self.stats[counter] += len(urls)
+
+    def expired_tasks(self, now):
+        """Return the queued urls that have gone TASK_TIMEOUT without being requeued"""
+        with self.task_lock:
+            rows = self.db.execute(
+                "SELECT url FROM tasks WHERE status = 'queued' AND ts < ?", (now - TASK_TIMEOUT,)
+            ).fetchall()
+        return [url for url, in rows]
+
+    def forget_old_tasks(self):
+        """Drop tasks older than TASK_TTL so the table stays bounded"""
+        with self.task_lock, self.db:
+            forgotten = self.db.execute(
+                "DELETE FROM tasks WHERE created < ?", (time.time() - TASK_TTL,)
+            ).rowcount
+        if forgotten:
+            logging.info("🧹 Forgot %s tasks older than %ss", forgotten, TASK_TTL)
 
     def add_user_urls(self, urls):
         """Add user-submitted URLs to the queue"""
         # User URLs are added to the same pool as seeds, just with a different source label
-        logging.info(f"👤 Received {len(urls)} URLs from user")
+        logging.info("👤 Received %s URLs from user", len(urls))
         self.add_urls_to_queue(urls, source="user")
         # Update stats to show the user submissions
-        logging.info(f"📊 Total URLs in system: {self.stats['total_urls']} (including user submissions)")
+        logging.info("📊 Total URLs in system: %s (including user submissions)", self.stats['total_urls'])
 
     def monitor_heartbeats(self):
         while True:
             try:
                 messages = sqs.receive_message(
-                    QueueUrl=HEARTBEAT_QUEUE_URL, MaxNumberOfMessages=10, WaitTimeSeconds=10
+                    QueueUrl=HEARTBEAT_QUEUE_URL, MaxNumberOfMessages=10, WaitTimeSeconds=HEARTBEAT_WAIT_TIME
                 )
                 if "Messages" in messages:
                     for msg in messages["Messages"]:
                         try:
-                            data = json.loads(msg["Body"])
+                            data = orjson.loads(msg["Body"])
                             cid = data["crawler_id"]
-                            self.crawler_status[cid] = time.time()
-                            logging.info(f"💓 Heartbeat from {cid} | Crawled: {data.get('crawled', 0)} | Failed: {data.get('failed', 0)}")
+                            with self.status_lock:
+                                self.crawler_status[cid] = time.time()
+                            logging.info("💓 Heartbeat from %s | Crawled: %s | Failed: %s",
+                                         cid, data.get("crawled", 0), data.get("failed", 0))
                         except Exception as e:
-                            logging.error(f"❌ Error processing heartbeat: {e}")
-                        finally:
-                            sqs.delete_message(
-                                QueueUrl=HEARTBEAT_QUEUE_URL, 
-                                ReceiptHandle=msg["ReceiptHandle"]
-                            )
+                            logging.error("❌ Error processing heartbeat: %s", e)
+                    delete_heartbeats(HEARTBEAT_QUEUE_URL, messages["Messages"])
             except Exception as e:
-                logging.error(f"❌ Error in heartbeat monitor: {e}")
+                logging.error("❌ Error in heartbeat monitor: %s", e)
                 time.sleep(5)  # Back off on errors
 
     def monitor_indexer_heartbeats(self):
         while True:
             try:
                 messages = sqs.receive_message(
-                    QueueUrl=INDEXER_HEARTBEAT_QUEUE_URL, MaxNumberOfMessages=10, WaitTimeSeconds=10
+                    QueueUrl=INDEXER_HEARTBEAT_QUEUE_URL, MaxNumberOfMessages=10, WaitTimeSeconds=HEARTBEAT_WAIT_TIME
                 )
                 if "Messages" in messages:
                     for msg in messages["Messages"]:
                         try:
-                            data = json.loads(msg["Body"])
+                            data = orjson.loads(msg["Body"])
                             iid = data["indexer_id"]
-                            logging.info(f"💓 Heartbeat from indexer {iid} | Indexed: {data.get('indexed', 0)}")
+                            logging.info("💓 Heartbeat from indexer %s | Indexed: %s", iid, data.get("indexed", 0))
                         except Exception as e:
-                            logging.error(f"❌ Error processing indexer heartbeat: {e}")
-                        finally:
-                            sqs.delete_message(
-                                QueueUrl=INDEXER_HEARTBEAT_QUEUE_URL, 
-                                ReceiptHandle=msg["ReceiptHandle"]
-                            )
+                            logging.error("❌ Error processing indexer heartbeat: %s", e)
+                    delete_heartbeats(INDEXER_HEARTBEAT_QUEUE_URL, messages["Messages"])
             except Exception as e:
-                logging.error(f"❌ Error in indexer heartbeat monitor: {e}")
+                logging.error("❌ Error in indexer heartbeat monitor: %s", e)
                 time.sleep(5)  # Back off on errors
 
     def check_task_timeouts(self):
-        while True:
-            time.sleep(15)
-            try:
-                now = time.time()
-                for url, meta in list(self.task_status.items()):
-                    if meta["status"] == "queued":
-                        if now - meta["timestamp"] > TASK_TIMEOUT:
-                            logging.warning(f"⏱️ Task timeout for URL: {url}, requeuing...")
-                            message = json.dumps({"url": url})
-                            try:
-                                sqs.send_message(QueueUrl=CRAWLER_QUEUE_URL, MessageBody=message)
-                                self.task_status[url]["timestamp"] = time.time()
-                                self.stats["requeued"] += 1
-                            except Exception as e:
-                                logging.error(f"❌ Failed to requeue URL: {url}, {str(e)}")
-            except Exception as e:
-                logging.error(f"❌ Error checking task timeouts: {e}")
-                time.sleep(5)  # Back off on errors
+        try:
+            timed_out = []
+            for url in self.expired_tasks(time.time()):
+                logging.debug("⏱️ Task timeout for URL: %s, requeuing...", url)
+                timed_out.append((url, orjson.dumps({"url": url}).decode()))
+            if timed_out:
+                logging.warning("⏱️ %s tasks timed out, requeuing...", len(timed_out))
+            # URLs that fail to send keep their old ts and come up again next pass
+            self.mark_queued(send_url_messages(timed_out), "requeued")
+            self.forget_old_tasks()
+        except Exception as e:
+            logging.error("❌ Error checking task timeouts: %s", e)
 
     def monitor_crawler_health(self):
-        while True:
-            time.sleep(30)
-            try:
-                now = time.time()
-                active = 0
-                failed = 0
-                for cid, ts in self.crawler_status.items():
-                    if now - ts <= 90:
-                        active += 1
-                    else:
-                        failed += 1
-                        logging.warning(f"❌ Crawler {cid} considered FAILED (no heartbeat in 90s)")
+        try:
+            # One cutoff instead of a subtraction per crawler
+            cutoff = time.time() - CRAWLER_TIMEOUT
+            with self.status_lock:
+                failed_ids = [cid for cid, ts in self.crawler_status.items() if ts < cutoff]
+                active = len(self.crawler_status) - len(failed_ids)
+            failed = len(failed_ids)
+            for cid in failed_ids:
+                logging.warning("❌ Crawler %s considered FAILED (no heartbeat in %ss)", cid, CRAWLER_TIMEOUT)
+            with self.task_lock:
                 self.stats["active_crawlers"] = active
                 self.stats["failed_crawlers"] = failed
-                logging.info(f"📊 Crawler Status | Active: {active} | Failed: {failed}")
-            except Exception as e:
-                logging.error(f"❌ Error monitoring crawler health: {e}")
-                time.sleep(5)  # Back off on errors
+            logging.info("📊 Crawler Status | Active: %s | Failed: %s", active, failed)
+        except Exception as e:
+            logging.error("❌ Error monitoring crawler health: %s", e)
 
     def report_stats(self):
-        while True:
-            time.sleep(60)
-            try:
-                logging.info(f"📈 Stats: {self.stats}")
-            except Exception as e:
-                logging.error(f"❌ Error reporting stats: {e}")
+        try:
+            with self.task_lock:
+                stats = dict(self.stats)
+            logging.info("📈 Stats: %s", stats)
+        except Exception as e:
+            logging.error("❌ Error reporting stats: %s", e)
+
+    def run_periodic_tasks(self):
+        """Run the timer-driven checks from one scheduler thread
+
+        Each check catches its own errors, so a failure never stops the scheduler.
+        """
+        scheduler = sched.scheduler(time.time, time.sleep)
+
+        def every(interval, priority, task):
+            def tick():
+                scheduler.enter(interval, priority, tick)
+                task()
+            scheduler.enter(interval, priority, tick)
+
+        every(TIMEOUT_CHECK_INTERVAL, 1, self.check_task_timeouts)
+        every(HEALTH_CHECK_INTERVAL, 2, self.monitor_crawler_health)
+        every(STATS_INTERVAL, 3, self.report_stats)
+        scheduler.run()
 
     def start(self, seed_urls=None):
         """Start the master node with optional seed URLs"""
         if seed_urls:
             self.add_urls_to_queue(seed_urls, source="seed")
-            logging.info(f"🌱 Added {len(seed_urls)} seed URLs to the crawl queue")
+            logging.info("🌱 Added %s seed URLs to the crawl queue", len(seed_urls))
 
         # Start only the essential monitoring threads
-        threading.Thread(target=self.monitor_heartbeats, daemon=True).start()
-        threading.Thread(target=self.check_task_timeouts, daemon=True).start()
-        threading.Thread(target=self.monitor_crawler_health, daemon=True).start()
-        threading.Thread(target=self.monitor_indexer_heartbeats, daemon=True).start()
-        threading.Thread(target=self.report_stats, daemon=True).start()
+        # Several long-poll loops per heartbeat queue so draining keeps up with many nodes
+        for _ in range(HEARTBEAT_RECEIVERS):
+            threading.Thread(target=self.monitor_heartbeats, daemon=True).start()
+            threading.Thread(target=self.monitor_indexer_heartbeats, daemon=True).start()
+        # The receivers block on the network; everything else shares one timer thread
+        threading.Thread(target=self.run_periodic_tasks, daemon=True).start()
 
         logging.info("🚀 Master Node started with heartbeat & timeout monitoring")
         
@@ -195,19 +307,54 @@ class MasterNode:
                 logging.info("👋 Shutting down gracefully...")
                 break
 
+# scheme (optional), host, then everything up to the fragment
+URL_RE = re.compile(r"^(?:([a-z][a-z0-9+.\-]*):)?(//)?([^?#]*)(?:\?([^#]*))?", re.IGNORECASE)
+
 def normalize_url(url):
     """Normalize URL to canonical form"""
-    try:
-        parsed = urllib.parse.urlparse(url)
-        # Remove fragments and standardize scheme
-        normalized = parsed._replace(fragment="").geturl()
-        # Add http:// if no scheme
-        if not parsed.scheme:
-            normalized = "http://" + normalized
-        # Remove trailing slashes for consistency
-        return normalized.rstrip("/")
-    except Exception:
-        return url  # Return original on error
+    # Fast path for the common case: http(s), no fragment, no trailing slash or empty
+    # ?/; part, and an already-lowercase scheme and host normalize to themselves
+    if (url.startswith(("http://", "https://")) and "#" not in url
+            and not url.endswith(("/", "?", ";")) and ";?" not in url):
+        host_end = url.find("/", 8)
+        head = url if host_end == -1 else url[:host_end]
+        if head == head.lower():
+            return url
+    return _normalize_url(url)
+
+def drop_empty_params(path):
+    """Drop a ';' that opens an empty parameter list on the last path segment, as urlparse does"""
+    if path.endswith(";") and path.find(";", path.rfind("/") + 1) == len(path) - 1:
+        return path[:-1]
+    return path
+
+@functools.lru_cache(maxsize=65536)
+def _normalize_url(url):
+    scheme, slashes, path, query = URL_RE.match(url).groups()
+    if scheme and not slashes:
+        # mailto:, user:pass@host and the like have no authority to touch
+        scheme = scheme.lower()
+        prefix, host = scheme + ":", ""
+        if scheme in uses_params:
+            path = drop_empty_params(path)
+    else:
+        scheme = (scheme or "http").lower()
+        if not slashes:
+            # No scheme: the whole string is a path to urlparse, params included
+            path = drop_empty_params(path)
+        end = path.find("/")
+        if end == -1:
+            end = len(path)
+        authority, path = path[:end], path[end:]
+        # Like urlparse, only schemes that take ;params (http, https, ftp, ...) lose an empty one
+        if slashes and scheme in uses_params:
+            path = drop_empty_params(path)
+        # Only the host is case-insensitive; user:pass@ in front of it keeps its case
+        userinfo, at, host = authority.rpartition("@")
+        prefix, host = f"{scheme}://", userinfo + at + host.lower()
+    # Remove fragments and empty queries, add http:// if no scheme, and remove trailing
+    # slashes for consistency
+    return f"{prefix}{host}{path}{'?' + query if query else ''}".rstrip("/")
 
 if __name__ == "__main__":
     seed_urls = [
@@ -219,9 +366,6 @@ if __name__ == "__main__":
         "https://news.ycombinator.com"
     ]
     
-    # Normalize all seed URLs
-    normalized_seeds = [normalize_url(url) for url in seed_urls]
-    
-    # Create and start master node
+    # Create and start master node; add_urls_to_queue normalizes the seeds
     master = MasterNode()
-    master.start(normalized_seeds)
+    master.start(seed_urls)
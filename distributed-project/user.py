@@ -1,23 +1,24 @@
-import boto3
-import json
+import orjson
 import argparse
 import time
 import sys
 import os
-import subprocess
 import colorama
 import urllib.parse
+import functools
 from colorama import Fore, Style
 import logging
 from datetime import datetime
 import socket
 import importlib.util
-
-# Initialize colorama for cross-platform colored terminal output
-colorama.init(autoreset=True)
+from concurrent.futures import ThreadPoolExecutor
 
 # Constants - SQS queue for direct submission to master node
 CRAWLER_QUEUE_URL = "https://sqs.eu-north-1.amazonaws.com/543442417201/mycrawlerQueue"
+SQS_BATCH_SIZE = 10  # SendMessageBatch maximum entries
+SQS_BATCH_BYTES = 256 * 1024  # SendMessageBatch maximum total payload
+SUBMIT_WORKERS = 8  # SendMessageBatch calls in flight at once
+VERBOSE_URL_LIMIT = 50  # above this many URLs, per-URL confirmations give way to a progress counter
 
 # Setup logging
 logging.basicConfig(
@@ -30,18 +31,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# AWS setup
-try:
-    # Use standard boto3 credential resolution (environment vars, AWS config files, etc.)
-    sqs = boto3.client("sqs", region_name="eu-north-1")
-    s3 = boto3.client("s3", region_name="eu-north-1")
-except Exception as e:
-    logger.error(f"Failed to initialize AWS clients: {e}")
-    print(f"{Fore.RED}Error: Failed to initialize AWS. Check your credentials and internet connection.{Style.RESET_ALL}")
-    sys.exit(1)
+def init_colors():
+    """Initialize colorama for cross-platform colored terminal output; when output is not a
+    terminal the color codes are stripped instead"""
+    if sys.stdout.isatty():
+        colorama.init(autoreset=True)
+    else:
+        colorama.init(strip=True)
+
+# AWS setup - boto3 is only imported and the client built on first submission, so the
+# menu, dashboard and search paths start without paying for it
+@functools.lru_cache(maxsize=None)
+def get_sqs():
+    """Shared SQS client, created on first use"""
+    import boto3
+    from botocore.config import Config
+    # Use standard boto3 credential resolution (environment vars, AWS config files, etc.);
+    # the pool holds a kept-alive connection for every submit worker, and adaptive retries
+    # back off when SQS throttles
+    return boto3.client("sqs", region_name="eu-north-1", config=Config(
+        max_pool_connections=SUBMIT_WORKERS,
+        retries={"mode": "adaptive", "max_attempts": 5},
+        tcp_keepalive=True
+    ))
 
+@functools.lru_cache(maxsize=4096)
 def normalize_url(url):
-    """Normalize URL to canonical form"""
+    """Normalize URL to canonical form (cached: resubmitted lists repeat the same URLs)"""
+    # Fast path: with a scheme and host already present and no fragment, quotes, empty ?/;
+    # parts or tab/CR/LF for urlparse to drop, and no bracketed (IPv6) host it may reject,
+    # only the trailing slash changes
+    if (url.startswith(("http://", "https://")) and not url.startswith(("http:///", "https:///"))
+            and not any(c in url for c in "#;'\"\t\r\n[]")
+            and not url.rstrip("/").endswith("?")):
+        return url.rstrip("/")
     try:
         # Remove any surrounding quotes if present
         url = url.strip('"\'')
@@ -59,66 +82,136 @@ def normalize_url(url):
         logger.error(f"Error normalizing URL {url}: {e}")
         return url  # Return original on error
 
+def send_url_batch(batch, verbose=True):
+    """Send one batch of (url, normalized_url, message) entries; returns (sent count, failed urls)"""
+    entries = [{"Id": str(i), "MessageBody": message} for i, (_, _, message) in enumerate(batch)]
+    try:
+        response = get_sqs().send_message_batch(QueueUrl=CRAWLER_QUEUE_URL, Entries=entries)
+    except Exception as e:
+        response = {"Failed": [{"Id": entry["Id"], "Message": str(e)} for entry in entries]}
+
+    # The whole batch's report goes out in one write rather than a print (and flush) per URL
+    lines = []
+    if verbose:
+        for success in response.get("Successful", []):
+            lines.append(f"{Fore.GREEN}✓ URL sent to master: {batch[int(success['Id'])][1]}{Style.RESET_ALL}\n")
+    failed_urls = []
+    for failure in response.get("Failed", []):
+        url = batch[int(failure["Id"])][0]
+        failed_urls.append(url)
+        logger.error(f"Failed to send URL {url}: {failure.get('Message')}")
+        lines.append(f"{Fore.RED}✗ Failed to send URL: {url} - {failure.get('Message')}{Style.RESET_ALL}\n")
+    if lines:
+        sys.stdout.write("".join(lines))
+        sys.stdout.flush()
+    return len(response.get("Successful", [])), failed_urls
+
 def send_urls_to_master(urls, depth_limit, restrict_domain=True):
     """Send URLs directly to the SQS queue that the master node monitors"""
     if not urls:
         print(f"{Fore.YELLOW}No URLs provided.{Style.RESET_ALL}")
         return
     
+    try:
+        get_sqs()
+    except Exception as e:
+        logger.error(f"Failed to initialize AWS clients: {e}")
+        print(f"{Fore.RED}Error: Failed to initialize AWS. Check your credentials and internet connection.{Style.RESET_ALL}")
+        return 0
+
     print(f"{Fore.CYAN}Sending URLs to master node...{Style.RESET_ALL}")
     
     success_count = 0
     failed_urls = []
+    # Up to SQS_BATCH_SIZE messages per SendMessageBatch call, cut early if the
+    # next message would push the batch past the request payload limit
+    batches = []
+    batch = []
+    batch_bytes = 0
+    # Repeats and host-less entries would only cost an SQS message and a master dedup each
+    seen = set()
+    duplicates = invalid = 0
     
     for url in urls:
         # Normalize URL
         normalized_url = normalize_url(url.strip())
         if not normalized_url:
             continue
-            
+        if normalized_url in seen:
+            duplicates += 1
+            continue
         try:
-            # Format message the same way the master node expects it
-            message = json.dumps({
+            has_host = bool(urllib.parse.urlparse(normalized_url).netloc)
+        except ValueError:
+            has_host = False  # e.g. an unterminated [IPv6] host
+        if not has_host:
+            invalid += 1
+            print(f"{Fore.YELLOW}Skipping invalid URL: {url}{Style.RESET_ALL}")
+            continue
+        seen.add(normalized_url)
+            
+        # Format message the same way the master node expects it
+        body = orjson.dumps({
             "url": normalized_url,
             "depth": 0,
             "depth_limit": depth_limit,
             "restrict_domain": restrict_domain
         })
-            
-            # Send directly to the SQS queue
-            sqs.send_message(QueueUrl=CRAWLER_QUEUE_URL, MessageBody=message)
-            success_count += 1
-            print(f"{Fore.GREEN}✓ URL sent to master: {normalized_url}{Style.RESET_ALL}")
-        except Exception as e:
-            failed_urls.append(url)
-            logger.error(f"Failed to send URL {url}: {e}")
-            print(f"{Fore.RED}✗ Failed to send URL: {url} - {e}{Style.RESET_ALL}")
+        size = len(body)
+        message = body.decode()
+        if batch and (len(batch) == SQS_BATCH_SIZE or batch_bytes + size > SQS_BATCH_BYTES):
+            batches.append(batch)
+            batch, batch_bytes = [], 0
+        batch.append((url, normalized_url, message))
+        batch_bytes += size
+
+    if batch:
+        batches.append(batch)
+    if duplicates or invalid:
+        logger.info(f"Dropped {duplicates} duplicate and {invalid} invalid URLs before sending")
+
+    # Several batches in flight at once; results are tallied here, so no locking is needed
+    # Long lists report a running count instead of a line per URL
+    verbose = len(seen) <= VERBOSE_URL_LIMIT
+    with ThreadPoolExecutor(max_workers=SUBMIT_WORKERS) as executor:
+        for sent, failed in executor.map(functools.partial(send_url_batch, verbose=verbose), batches):
+            success_count += sent
+            failed_urls.extend(failed)
+            if not verbose:
+                sys.stdout.write(f"{Fore.CYAN}Sent {success_count}/{len(seen)} URLs{Style.RESET_ALL}\n")
+                sys.stdout.flush()
     
     return success_count
 
+def find_script(*names):
+    """Path of the first of names that exists next to this file, or None"""
+    for name in names:
+        path = os.path.join(SCRIPT_DIR, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+# Sibling scripts the menu launches, looked up once at startup rather than on every use;
+# the capitalized dashboard name is tried first, lowercase as the fallback
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DASHBOARD_PATH = find_script("Dashboard.py", "dashboard.py")
+INDEXER_PATH = find_script("indexer.py")
+
 def launch_dashboard():
     """Launch the system dashboard in a new process with improved path detection"""
     try:
         print(f"{Fore.CYAN}Starting dashboard...{Style.RESET_ALL}")
         
-        # Get the current directory
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        print(f"Looking for dashboard in: {current_dir}")
-        
-        # Try with capitalized name first (which we know exists based on your folder structure)
-        dashboard_path = os.path.join(current_dir, "Dashboard.py")
-        
-        if not os.path.exists(dashboard_path):
-            # Try lowercase as fallback
-            dashboard_path = os.path.join(current_dir, "dashboard.py")
-            
-        if not os.path.exists(dashboard_path):
-            print(f"{Fore.RED}Error: Dashboard.py not found in {current_dir}{Style.RESET_ALL}")
+        print(f"Looking for dashboard in: {SCRIPT_DIR}")
+        dashboard_path = DASHBOARD_PATH
+        if dashboard_path is None:
+            print(f"{Fore.RED}Error: Dashboard.py not found in {SCRIPT_DIR}{Style.RESET_ALL}")
             return False
         
         print(f"Found dashboard at: {dashboard_path}")
         
         # Launch the dashboard in a new process
+        import subprocess
         cmd = [sys.executable, dashboard_path]
         print(f"Executing: {' '.join(cmd)}")
         subprocess.Popen(cmd)
@@ -131,18 +224,22 @@ def launch_dashboard():
 def launch_search():
     """Launch the search interface using the indexer's interactive_search function"""
     try:
-        # Get the current directory
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Import indexer using importlib
-        indexer_path = os.path.join(current_dir, "indexer.py")
-        if not os.path.exists(indexer_path):
-            print(f"{Fore.RED}Error: indexer.py not found in {current_dir}{Style.RESET_ALL}")
-            return False
-            
-        spec = importlib.util.spec_from_file_location("indexer", indexer_path)
-        indexer = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(indexer)
+        # Import indexer using importlib, once: later searches reuse the module from
+        # sys.modules, along with the index and clients it has already opened
+        indexer = sys.modules.get("indexer")
+        if indexer is None:
+            if INDEXER_PATH is None:
+                print(f"{Fore.RED}Error: indexer.py not found in {SCRIPT_DIR}{Style.RESET_ALL}")
+                return False
+
+            spec = importlib.util.spec_from_file_location("indexer", INDEXER_PATH)
+            indexer = importlib.util.module_from_spec(spec)
+            sys.modules["indexer"] = indexer
+            try:
+                spec.loader.exec_module(indexer)
+            except BaseException:
+                del sys.modules["indexer"]
+                raise
         
         # Launch the interactive search from the indexer module
         print(f"{Fore.CYAN}Starting search interface from indexer module...{Style.RESET_ALL}")
@@ -157,24 +254,40 @@ def launch_search():
         traceback.print_exc()
         return False
 
+def prompt(message):
+    """input() for a terminal; piped input is read straight from stdin without line editing"""
+    if sys.stdin.isatty():
+        return input(message)
+    sys.stdout.write(message)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip("\n")
+
+# Built once rather than on every pass through the menu loop
+MENU_BANNER = (
+    f"\n{Fore.CYAN}=== Distributed Web Crawler System ==={Style.RESET_ALL}\n"
+    "1. Submit URLs for crawling\n"
+    "2. Launch dashboard\n"
+    "3. Search indexed content\n"
+    "4. Exit\n"
+)
+
 def main_menu():
     """Display main menu interface"""
     while True:
-        print(f"\n{Fore.CYAN}=== Distributed Web Crawler System ==={Style.RESET_ALL}")
-        print(f"1. Submit URLs for crawling")
-        print(f"2. Launch dashboard")
-        print(f"3. Search indexed content")
-        print(f"4. Exit")
+        sys.stdout.write(MENU_BANNER)
         
         try:
-            choice = input(f"\n{Fore.GREEN}Choose an option (1-4): {Style.RESET_ALL}")
+            choice = prompt(f"\n{Fore.GREEN}Choose an option (1-4): {Style.RESET_ALL}")
             
             if choice == '1':
-                url_input = input(f"{Fore.GREEN}Enter URLs (comma-separated): {Style.RESET_ALL}")
+                url_input = prompt(f"{Fore.GREEN}Enter URLs (comma-separated): {Style.RESET_ALL}")
                 urls = [u.strip() for u in url_input.split(',') if u.strip()]
                 
-                depth_limit = int(input("Enter depth limit (e.g., 2): ") or "2")
-                restrict_domain = input("Restrict to same domain? (y/n): ").lower().startswith("y")
+                depth_limit = int(prompt("Enter depth limit (e.g., 2): ") or "2")
+                restrict_domain = prompt("Restrict to same domain? (y/n): ").lower().startswith("y")
 
                 send_urls_to_master(urls, depth_limit, restrict_domain)
 
@@ -192,7 +305,7 @@ def main_menu():
             else:
                 print(f"{Fore.YELLOW}Invalid option. Please choose 1-4.{Style.RESET_ALL}")
                 
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
             print(f"\n{Fore.CYAN}Program interrupted. Exiting.{Style.RESET_ALL}")
             break
         except Exception as e:
@@ -217,6 +330,8 @@ def parse_arguments():
     return parser.parse_args()
 
 if __name__ == "__main__":
+    init_colors()
+
     # Check if command line arguments were provided
     if len(sys.argv) > 1:
         args = parse_arguments()